@@ -5,11 +5,72 @@ by accessing available applications and filtering locally
 """
 
 import requests
-import time
-from bs4 import BeautifulSoup
-from config import BOROUGHS_CONFIG, MONITORING_KEYWORDS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+import lxml.html
+from lxml import etree
+from config import BOROUGHS_CONFIG, MONITORING_KEYWORDS, MONITORING_KEYWORDS_BYTES
+from utils import KeywordMatcher
+from database import PlanningDatabase
 import re
+import threading
+import queue
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Each borough lives on its own host; cap in-flight detail requests per host
+MAX_REQUESTS_PER_HOST = 4
+
+# Built once at import so every page is scanned in a single pass
+KEYWORD_MATCHER = KeywordMatcher(MONITORING_KEYWORDS)
+
+# Link filtering helpers, compiled once rather than per <a> element
+APP_ID_RE = re.compile(r'([A-Z0-9/\-\.]{6,})')
+SKIP_WORDS = frozenset(('home', 'search', 'help', 'about', 'login', 'menu'))
+APP_LINK_XPATH = etree.XPath(
+    '//a[contains(@href, "application") or contains(@href, "planning") or '
+    'contains(@href, "detail") or contains(@href, "view") or contains(@href, "/")]'
+)
+
+# Listing pages only need their anchors: skip building comment and PI nodes.
+# lxml serialises concurrent use of one parser, so each worker thread gets its own
+_parsers = threading.local()
+
+def get_listing_parser():
+    """Return this thread's lean HTML parser for listing pages"""
+    parser = getattr(_parsers, 'listing', None)
+    if parser is None:
+        parser = _parsers.listing = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+    return parser
+
+# Matches are written to the database in batches of this size while scraping continues
+DB_BATCH_SIZE = 50
+# Sentinel each borough worker puts on the match queue when it finishes
+BOROUGH_DONE = object()
+
+# Per-borough scan plan, built once: (name, base_url, candidate listing URLs)
+BOROUGH_PLAN = tuple(
+    (name, cfg['base_url'], (
+        cfg['search_url'],
+        f"{cfg['base_url']}/online-applications/",
+        f"{cfg['base_url']}/applications/",
+        f"{cfg['base_url']}/planning/"
+    ))
+    for name, cfg in BOROUGHS_CONFIG.items()
+)
+
+# Detail pages are streamed and scanned as they arrive, up to a fixed ceiling
+SCAN_CHUNK_SIZE = 16384
+MAX_SCAN_BYTES = 1024 * 1024  # also the largest page we accept at all
+# Carry this many bytes between chunks so keywords split across a boundary still match
+KEYWORD_OVERLAP = max(len(keyword) for keyword in MONITORING_KEYWORDS_BYTES) - 1
+# Markup is stripped so "Noise <b>Monitoring</b>" reads like the rendered text
+TAG_RE = re.compile(rb'<[^>]*>')
+# ASCII-only case folding for raw page bytes; the keywords are plain ASCII
+ASCII_LOWER = bytes.maketrans(bytes(range(0x41, 0x5b)), bytes(range(0x61, 0x7b)))
+# A '<' this far from the chunk end is treated as text rather than a split tag
+MAX_TAG_BYTES = 2048
 
 class AlternativeScraper:
     def __init__(self):
@@ -17,28 +78,32 @@ class AlternativeScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5'
+            'Accept-Language': 'en-US,en;q=0.5',
+            # Includes br only when a brotli decoder is installed
+            'Accept-Encoding': ACCEPT_ENCODING
         })
         
-    def find_recent_applications(self, borough_name):
-        """Find recent applications by exploring the portal structure"""
+        # Keep one warm connection per concurrent worker on each borough host,
+        # so detail fetches reuse TLS sessions instead of reconnecting; transient
+        # connection failures are retried on the pooled connection with backoff
+        adapter = HTTPAdapter(
+            pool_connections=len(BOROUGHS_CONFIG),
+            pool_maxsize=MAX_REQUESTS_PER_HOST,
+            max_retries=Retry(total=3, backoff_factor=0.5)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+    def find_recent_applications(self, borough_name, base_url, search_urls):
+        """Yield recent matching applications by exploring the portal structure (one BOROUGH_PLAN entry)"""
         print(f"\n🏛️ EXPLORING {borough_name.upper()}")
         print("=" * 60)
         
-        config = BOROUGHS_CONFIG[borough_name]
-        base_url = config['base_url']
-        
-        found_applications = []
+        checked_count = 0
+        match_count = 0
         
         try:
             # Try different approaches to find applications
-            search_urls = [
-                config['search_url'],
-                f"{base_url}/online-applications/",
-                f"{base_url}/applications/",
-                f"{base_url}/planning/"
-            ]
-            
             for url in search_urls:
                 try:
                     print(f"\n📍 Checking: {url}")
@@ -47,25 +112,33 @@ class AlternativeScraper:
                     if response.status_code == 200:
                         print(f"✅ Access successful")
                         
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        # Link extraction only needs the anchors, so build the tree in C with lxml
+                        tree = lxml.html.fromstring(response.content, parser=get_listing_parser())
                         
                         # Look for application links
-                        app_links = self.find_application_links(soup, base_url)
+                        app_links = self.find_application_links(tree, base_url)
                         print(f"🔗 Found {len(app_links)} application links")
                         
-                        # Check each application for keywords
-                        for i, (app_id, app_url, title) in enumerate(app_links[:10]):  # Check first 10
-                            print(f"\n   📄 Checking application {i+1}: {app_id}")
-                            print(f"      Title: {title[:50]}...")
-                            
-                            app_data = self.check_application_details(app_id, app_url, title, borough_name)
-                            if app_data:
-                                found_applications.append(app_data)
-                                print(f"      🎯 MATCH! Keywords: {', '.join(app_data['keywords'])}")
-                            else:
-                                print(f"      ⏭️ No monitoring keywords found")
+                        # Check the first 10 applications concurrently, at most
+                        # MAX_REQUESTS_PER_HOST in flight against this borough's host
+                        to_check = app_links[:10]
+                        with ThreadPoolExecutor(max_workers=MAX_REQUESTS_PER_HOST) as executor:
+                            details = executor.map(
+                                lambda link: self.check_application_details(link[0], link[1], link[2], borough_name),
+                                to_check
+                            )
                             
-                            time.sleep(1)  # Be polite
+                            for i, ((app_id, app_url, title), app_data) in enumerate(zip(to_check, details)):
+                                print(f"\n   📄 Checked application {i+1}: {app_id}")
+                                print(f"      Title: {title[:50]}...")
+                                
+                                checked_count += 1
+                                if app_data:
+                                    match_count += 1
+                                    print(f"      🎯 MATCH! Keywords: {', '.join(app_data['keywords'])}")
+                                    yield app_data
+                                else:
+                                    print(f"      ⏭️ No monitoring keywords found")
                         
                         if app_links:
                             break  # Found applications, no need to try other URLs
@@ -80,77 +153,56 @@ class AlternativeScraper:
             print(f"❌ Error exploring {borough_name}: {e}")
             
         print(f"\n🎉 SUMMARY for {borough_name}:")
-        print(f"   Applications checked: {len(found_applications) if found_applications else 'None'}")
-        print(f"   Matches found: {len(found_applications)}")
-        
-        return found_applications
+        print(f"   Applications checked: {checked_count if checked_count else 'None'}")
+        print(f"   Matches found: {match_count}")
     
-    def find_application_links(self, soup, base_url):
-        """Extract application links from a page"""
-        app_links = []
+    def find_application_links(self, tree, base_url):
+        """Extract application links from a parsed lxml page tree"""
+        # Keyed by URL so duplicates collapse as they are found, in page order
+        app_links = {}
         
-        # Look for various patterns of application links
-        patterns = [
-            # Standard Idox patterns
-            'a[href*="application"]',
-            'a[href*="planning"]', 
-            'a[href*="detail"]',
-            'a[href*="view"]',
-            # Look for specific application ID patterns
-            'a[href*="/"]'
-        ]
+        # One traversal over every <a> whose href matches any of the application
+        # link patterns (standard Idox paths, or anything path-like)
+        links = APP_LINK_XPATH(tree)
         
-        for pattern in patterns:
-            links = soup.select(pattern)
+        for link in links:
+            href = link.get('href', '')
+            text = link.text_content().strip()
             
-            for link in links:
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
+            # Skip navigation links, look for actual applications
+            text_lower = text.lower()
+            if any(skip in text_lower for skip in SKIP_WORDS):
+                continue
                 
-                # Skip navigation links, look for actual applications
-                if any(skip in text.lower() for skip in ['home', 'search', 'help', 'about', 'login', 'menu']):
-                    continue
-                    
-                # Look for application ID patterns
-                app_id_match = re.search(r'([A-Z0-9/\-\.]{6,})', text)
-                if app_id_match or 'application' in href.lower():
-                    
-                    # Make sure we have full URL
-                    full_url = href if href.startswith('http') else base_url + href
-                    app_id = app_id_match.group(1) if app_id_match else text[:20]
-                    
-                    app_links.append((app_id, full_url, text))
-        
-        # Remove duplicates
-        unique_links = []
-        seen_urls = set()
-        for app_id, url, title in app_links:
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_links.append((app_id, url, title))
+            # Look for application ID patterns
+            app_id_match = APP_ID_RE.search(text)
+            if app_id_match or 'application' in href.lower():
+                
+                # Make sure we have full URL
+                full_url = href if href.startswith('http') else base_url + href
+                app_id = app_id_match.group(1) if app_id_match else text[:20]
                 
-        return unique_links[:20]  # Limit to first 20
+                app_links.setdefault(full_url, (app_id, full_url, text))
+                if len(app_links) == 20:  # Limit to first 20
+                    break
+                
+        return list(app_links.values())
     
     def check_application_details(self, app_id, app_url, title, borough):
         """Check if an application contains monitoring keywords"""
         try:
-            response = self.session.get(app_url, timeout=10)
-            
-            if response.status_code != 200:
-                return None
+            with self.session.get(app_url, stream=True, timeout=10) as response:
+                if response.status_code != 200:
+                    return None
                 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Get all text content
-            page_text = soup.get_text().lower()
-            title_text = title.lower()
-            combined_text = f"{title_text} {page_text}"
-            
-            # Check for monitoring keywords
-            found_keywords = []
-            for keyword in MONITORING_KEYWORDS:
-                if keyword.lower() in combined_text:
-                    found_keywords.append(keyword)
+                # Oversized pages are error dumps or attachments, not application details
+                content_length = response.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > MAX_SCAN_BYTES:
+                    print(f"      ⏭️ Skipping {app_id}: {int(content_length) // 1024}KB page")
+                    return None
+                
+                # Check for monitoring keywords
+                found_keywords = self.scan_for_keywords(response, title)
             
             if found_keywords:
                 return {
@@ -166,37 +218,110 @@ class AlternativeScraper:
             print(f"      ❌ Error checking {app_id}: {str(e)[:30]}")
             
         return None
+    
+    def scan_for_keywords(self, response, title):
+        """Scan the raw page bytes for keywords, stopping once all are seen or the ceiling is hit"""
+        found = set(KEYWORD_MATCHER.find(title))
+        tail = b''
+        pending = b''
+        scanned = 0
+        
+        for chunk in response.iter_content(chunk_size=SCAN_CHUNK_SIZE, decode_unicode=False):
+            scanned += len(chunk)
+            data = pending + chunk.translate(ASCII_LOWER)
+            
+            # Hold back a tag cut off by the chunk boundary until its '>' arrives
+            cut = data.rfind(b'<')
+            if cut != -1 and len(data) - cut < MAX_TAG_BYTES and data.find(b'>', cut) == -1:
+                data, pending = data[:cut], data[cut:]
+            else:
+                pending = b''
+            
+            window = tail + TAG_RE.sub(b'', data)
+            # latin-1 maps each byte to one character, so the scan stays byte-for-byte
+            # and the already-lowered window skips a second str.lower()
+            found.update(KEYWORD_MATCHER.find_lowered(window.decode('latin-1')))
+            
+            if len(found) == len(MONITORING_KEYWORDS) or scanned >= MAX_SCAN_BYTES:
+                break
+            
+            tail = window[-KEYWORD_OVERLAP:]
+        else:
+            # A held-back '<' never closed, so it was text after all; scan it once
+            if pending:
+                window = tail + pending
+                found.update(KEYWORD_MATCHER.find_lowered(window.decode('latin-1')))
+        
+        return [keyword for keyword in MONITORING_KEYWORDS if keyword in found]
+
+def to_database_record(app):
+    """Map an alternative-search match onto the planning_applications columns"""
+    return {
+        'project_id': app['app_id'],
+        'borough': app['borough'],
+        'title': app['title'],
+        'application_url': app['url'],
+        'detected_keywords': app['keywords'],
+        'source_url': app['url']
+    }
+
+def stream_borough(scraper, plan, matches):
+    """Push one borough's matches onto the shared queue as they are found"""
+    try:
+        for app in scraper.find_recent_applications(*plan):
+            matches.put(app)
+    except Exception as e:
+        print(f"❌ Error with {plan[0]}: {e}")
+    finally:
+        matches.put(BOROUGH_DONE)
 
 def run_alternative_search():
-    """Run the alternative search approach"""
+    """Run the alternative search approach, saving matches as they stream in"""
     print("🚀 ALTERNATIVE PLANNING APPLICATION SEARCH")
     print("This approach accesses available applications directly")
     print("=" * 80)
     
     scraper = AlternativeScraper()
-    all_results = []
-    
-    # Test each borough
-    for borough_name in BOROUGHS_CONFIG.keys():
-        try:
-            results = scraper.find_recent_applications(borough_name)
-            all_results.extend(results)
-            time.sleep(2)  # Be polite between boroughs
-        except Exception as e:
-            print(f"❌ Error with {borough_name}: {e}")
-    
-    print("\n\n🎯 FINAL RESULTS")
-    print("=" * 80)
+    database = PlanningDatabase()
+    matches = queue.Queue()
+    batch = []
+    match_count = 0
+    new_count = 0
     
-    if all_results:
-        print(f"✅ Found {len(all_results)} applications with monitoring keywords!")
+    # Boroughs are on different hosts, so explore them all at once; this thread
+    # reports and stores each match while the workers keep scraping
+    with ThreadPoolExecutor(max_workers=len(BOROUGH_PLAN)) as executor:
+        for plan in BOROUGH_PLAN:
+            executor.submit(stream_borough, scraper, plan, matches)
         
-        for i, app in enumerate(all_results, 1):
-            print(f"\n{i}. 📋 {app['app_id']} ({app['borough']})")
+        remaining = len(BOROUGH_PLAN)
+        while remaining:
+            app = matches.get()
+            if app is BOROUGH_DONE:
+                remaining -= 1
+                continue
+            
+            match_count += 1
+            print(f"\n🎯 MATCH {match_count}. 📋 {app['app_id']} ({app['borough']})")
             print(f"   Title: {app['title'][:60]}...")
             print(f"   Keywords: {', '.join(app['keywords'])}")
             print(f"   URL: {app['url']}")
             print(f"   Found: {app['found_at']}")
+            
+            batch.append(to_database_record(app))
+            if len(batch) >= DB_BATCH_SIZE:
+                new_count += database.bulk_insert_applications(batch)[1]
+                batch = []
+    
+    if batch:
+        new_count += database.bulk_insert_applications(batch)[1]
+    
+    print("\n\n🎯 FINAL RESULTS")
+    print("=" * 80)
+    
+    if match_count:
+        print(f"✅ Found {match_count} applications with monitoring keywords!")
+        print(f"💾 {new_count} new applications saved to the database")
     else:
         print("❌ No applications with monitoring keywords found")
         print("\nPossible reasons:")
@@ -204,7 +329,7 @@ def run_alternative_search():
         print("- Recent applications might not have environmental monitoring requirements")
         print("- The sites may only show applications after user authentication")
     
-    return all_results
+    return match_count
 
 if __name__ == "__main__":
     results = run_alternative_search() 
\ No newline at end of file
@@ -5,8 +5,12 @@ Based on manual browser success: "Too many results found"
 """
 
 import requests
-from bs4 import BeautifulSoup
-import time
+from urllib3.util.request import ACCEPT_ENCODING
+from bs4 import BeautifulSoup, SoupStrainer
+from utils import RateLimiter
+
+# The search page is only read for its hidden CSRF input
+CSRF_STRAINER = SoupStrainer('input', attrs={'name': '_csrf'})
 
 def test_westminster_breakthrough():
     print("🎉 WESTMINSTER BREAKTHROUGH TEST")
@@ -22,7 +26,7 @@ def test_westminster_breakthrough():
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
+        'Accept-Encoding': ACCEPT_ENCODING,
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1',
         'Sec-Fetch-Dest': 'document',
@@ -39,30 +43,38 @@ def test_westminster_breakthrough():
         "basement extension"
     ]
     
+    # The CSRF token is session-scoped, so fetch the search page once for all terms
+    try:
+        print("\n📄 Getting search page...")
+        response = session.get(search_url)
+        
+        if response.status_code != 200:
+            print(f"❌ Can't access search page: {response.status_code}")
+            return False
+            
+        # Parse to get CSRF token
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=CSRF_STRAINER)
+        csrf_input = soup.find('input', {'name': '_csrf'})
+        
+        if not csrf_input:
+            print("❌ No CSRF token found")
+            return False
+            
+        csrf_token = csrf_input.get('value')
+        print(f"🔑 CSRF token: {csrf_token[:20]}...")
+        
+    except Exception as e:
+        print(f"❌ Exception: {str(e)[:50]}")
+        return False
+    
+    # Be polite between searches, without waiting again for time already spent on a response
+    rate_limiter = RateLimiter(3)
+    
     for search_term in search_terms:
         print(f"\n🔍 Testing: '{search_term}'")
         print("-" * 50)
         
         try:
-            # First, get the search page to extract CSRF token
-            print("   📄 Getting search page...")
-            response = session.get(search_url)
-            
-            if response.status_code != 200:
-                print(f"   ❌ Can't access search page: {response.status_code}")
-                continue
-                
-            # Parse to get CSRF token
-            soup = BeautifulSoup(response.content, 'html.parser')
-            csrf_input = soup.find('input', {'name': '_csrf'})
-            
-            if not csrf_input:
-                print("   ❌ No CSRF token found")
-                continue
-                
-            csrf_token = csrf_input.get('value')
-            print(f"   🔑 CSRF token: {csrf_token[:20]}...")
-            
             # Build form data exactly like the real form
             form_data = {
                 '_csrf': csrf_token,
@@ -79,6 +91,7 @@ def test_westminster_breakthrough():
             session.headers['Referer'] = search_url
             
             # Submit the search
+            rate_limiter.wait()
             search_response = session.post(submit_url, data=form_data, timeout=15)
             
             print(f"   📊 Response: {search_response.status_code}")
@@ -106,7 +119,7 @@ def test_westminster_breakthrough():
                     print("   🎉 SUCCESS! Results found and parsed!")
                     
                     # Try to parse actual results
-                    results_soup = BeautifulSoup(search_response.content, 'html.parser')
+                    results_soup = BeautifulSoup(search_response.content, 'lxml')
                     tables = results_soup.find_all('table')
                     
                     for table in tables:
@@ -141,8 +154,6 @@ def test_westminster_breakthrough():
                 
         except Exception as e:
             print(f"   ❌ Exception: {str(e)[:50]}")
-            
-        time.sleep(3)  # Be polite between searches
     
     print("\n\n🎯 SUMMARY")
     print("=" * 40)
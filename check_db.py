@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 import sqlite3
 
-conn = sqlite3.connect('planning_applications.db')
+conn = sqlite3.connect('planning_applications.db', isolation_level=None)
+conn.execute('PRAGMA query_only=1')
+conn.execute('PRAGMA cache_size=-20000')
 cursor = conn.cursor()
 
-cursor.execute('SELECT COUNT(*) FROM planning_applications')
-count = cursor.fetchone()[0]
+# One round-trip: the window count rides along with the sample rows
+cursor.execute('''
+    SELECT COUNT(*) OVER (), project_id, borough, detected_keywords
+    FROM planning_applications LIMIT 5
+''')
+rows = cursor.fetchall()
+count = rows[0][0] if rows else 0
 print(f'Applications in database: {count}')
 
 if count > 0:
-    cursor.execute('SELECT project_id, borough, detected_keywords FROM planning_applications LIMIT 5')
     print('\nSample applications:')
-    for row in cursor.fetchall():
-        print(f'  {row[0]} ({row[1]}): {row[2]}')
+    for row in rows:
+        print(f'  {row[1]} ({row[2]}): {row[3]}')
 
-conn.close() 
\ No newline at end of file
+conn.close()
\ No newline at end of file
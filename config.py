@@ -14,6 +14,10 @@ MONITORING_KEYWORDS = [
     "subsidence monitoring"
 ]
 
+# Lowercase and byte forms, computed once for the page scanners
+MONITORING_KEYWORDS_LOWER = tuple(keyword.lower() for keyword in MONITORING_KEYWORDS)
+MONITORING_KEYWORDS_BYTES = tuple(keyword.encode('utf-8') for keyword in MONITORING_KEYWORDS_LOWER)
+
 # London Borough Configuration
 BOROUGHS_CONFIG = {
     "Camden": {
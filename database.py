@@ -5,30 +5,115 @@ Handles SQLite database operations and schema management
 
 import sqlite3
 import logging
+import threading
+import weakref
+from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
 from contextlib import contextmanager
 import pandas as pd
 
+# openpyxl is only needed for Excel exports
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
 from config import DATABASE_CONFIG
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-connection tuning for on-disk databases (WAL itself is persisted at init)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# Hot write statements, kept as constants so every call hits the same cached
+# prepared statement on the persistent connections
+_SQL_INSERT_APP = """
+    INSERT OR IGNORE INTO planning_applications 
+    (project_id, borough, title, address, submission_date, 
+     application_url, detected_keywords, scraped_timestamp, source_url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Leading _SQL_INSERT_APP columns copied straight from an application dict
+_APP_FIELDS = ('project_id', 'borough', 'title', 'address', 'submission_date', 'application_url')
+_SQL_INSERT_KEYWORD = "INSERT OR IGNORE INTO application_keywords (application_id, keyword) VALUES (?, ?)"
+_SQL_INSERT_LOG = """
+    INSERT INTO scraping_logs 
+    (borough, scrape_timestamp, records_found, records_new, status, error_message)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Columns callers may project from planning_applications; names are interpolated
+# into SQL, so anything else is rejected
+_ALLOWED_COLS = frozenset((
+    'id', 'project_id', 'borough', 'title', 'address', 'submission_date',
+    'application_url', 'detected_keywords', 'scraped_timestamp', 'source_url', 'status'
+))
+
+# (project_id, borough) pairs per duplicate-check query; two variables each keeps
+# well under SQLite's bound-variable limit
+KEY_CHUNK_SIZE = 500
+
+# PRAGMA user_version once application_keywords has been backfilled
+KEYWORDS_SCHEMA_VERSION = 1
+
+# Rows per chunk when exporting, so exports never hold the whole table in memory
+EXPORT_CHUNKSIZE = 10000
+
+class _ReaderHolder:
+    """Per-thread holder of a reader connection; the thread-local drops it when its
+    thread exits, which closes the connection"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+
+def _release_reader(conn, open_readers, lock):
+    """Close a reader and forget it (on thread exit or database close)"""
+    with lock:
+        open_readers.discard(conn)
+    conn.close()
+
 class PlanningDatabase:
     """Handles all database operations for planning applications"""
     
     def __init__(self, db_path: str = None):
         self.db_path = db_path or DATABASE_CONFIG["db_path"]
+        
+        # One persistent writer shared across threads (SQLite allows a single writer),
+        # plus a lazily opened read-only connection per thread
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._transaction_thread = None  # Thread currently inside transaction(), if any
+        self._readers = threading.local()
+        self._open_readers = set()  # Readers of live threads, so close() can close them all
+        self._readers_lock = threading.Lock()
+        
+        # Scraping logs are buffered and written in batches rather than one commit per borough
+        self._log_lock = threading.Lock()
+        self._pending_logs = []
+        self._log_flush_threshold = 32
+        
         self.init_database()
     
     def init_database(self):
         """Initialize database and create tables if they don't exist"""
         try:
-            with self.get_connection() as conn:
+            with self.get_writer() as conn:
                 cursor = conn.cursor()
                 
+                # WAL lets dashboard readers run alongside the scraper's writes;
+                # it is stored in the database file, so setting it once is enough
+                if self.db_path != ':memory:':
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                
                 # Create planning_applications table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS planning_applications (
@@ -60,17 +145,45 @@ class PlanningDatabase:
                     )
                 """)
                 
-                # Create indexes for better performance
+                # Create indexes for better performance: both match get_applications'
+                # ORDER BY submission_date DESC, so newest-first pages need no sort
+                cursor.execute("DROP INDEX IF EXISTS idx_borough_date")
                 cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_borough_date 
-                    ON planning_applications (borough, submission_date)
+                    CREATE INDEX IF NOT EXISTS idx_borough_date_desc 
+                    ON planning_applications (borough, submission_date DESC, id)
                 """)
                 
                 cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_keywords 
-                    ON planning_applications (detected_keywords)
+                    CREATE INDEX IF NOT EXISTS idx_submission_date_desc 
+                    ON planning_applications (submission_date DESC)
                 """)
                 
+                # One row per (keyword, application) so keyword filters and counts are
+                # index lookups; the LIKE-only idx_keywords index could never be used
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS application_keywords (
+                        application_id INTEGER REFERENCES planning_applications(id),
+                        keyword TEXT,
+                        PRIMARY KEY (keyword, application_id)
+                    ) WITHOUT ROWID
+                """)
+                
+                cursor.execute("DROP INDEX IF EXISTS idx_keywords")
+                
+                # Backfill keywords for databases created before the junction table, once,
+                # in a single transaction; user_version records that it has been done
+                if cursor.execute("PRAGMA user_version").fetchone()[0] < KEYWORDS_SCHEMA_VERSION:
+                    cursor.execute("BEGIN IMMEDIATE")
+                    cursor.execute("""
+                        SELECT id, detected_keywords FROM planning_applications
+                        WHERE detected_keywords != ''
+                    """)
+                    self._insert_keywords(cursor, [
+                        (app_id, detected.split(', ')) for app_id, detected in cursor.fetchall()
+                    ])
+                    cursor.execute(f"PRAGMA user_version = {KEYWORDS_SCHEMA_VERSION}")
+                    cursor.execute("COMMIT")
+                
                 conn.commit()
                 logger.info("Database initialized successfully")
                 
@@ -78,141 +191,317 @@ class PlanningDatabase:
             logger.error(f"Database initialization error: {e}")
             raise
     
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a tuned connection; autocommit, multi-statement writes open their own transaction"""
+        if read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            # Only its own thread uses a reader, but close() may close it from another
+            conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False,
+                                   cached_statements=256)
+        else:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                                   cached_statements=256)
+        
+        if self.db_path != ':memory:':
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        return conn
+    
+    @contextmanager
+    def get_writer(self):
+        """Context manager yielding the shared writer connection, one thread at a time"""
+        with self._write_lock:
+            try:
+                yield self._writer
+            except sqlite3.Error as e:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                logger.error(f"Database connection error: {e}")
+                raise
+    
     @contextmanager
-    def get_connection(self):
-        """Context manager for database connections"""
-        conn = None
+    def transaction(self):
+        """Run several writes (bulk inserts, scraping logs) as one BEGIN IMMEDIATE ... COMMIT"""
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            self._transaction_thread = threading.get_ident()
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._transaction_thread = None
+    
+    def _in_transaction(self) -> bool:
+        """Whether the calling thread is inside transaction()"""
+        return self._transaction_thread == threading.get_ident()
+    
+    @contextmanager
+    def get_reader(self):
+        """Context manager yielding this thread's persistent read-only connection"""
+        # Every connection to :memory: is a separate database, so read through the writer
+        if self.db_path == ':memory:':
+            with self.get_writer() as conn:
+                yield conn
+            return
+        
+        holder = getattr(self._readers, 'holder', None)
+        if holder is None or holder.conn is None:
+            conn = self._connect(read_only=True)
+            with self._readers_lock:
+                self._open_readers.add(conn)
+            # Short-lived threads (executor workers, Streamlit reruns) don't keep their
+            # connection open until close(): it is closed when the thread goes away
+            holder = self._readers.holder = _ReaderHolder(conn)
+            weakref.finalize(holder, _release_reader, conn, self._open_readers, self._readers_lock)
+        conn = holder.conn
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable column access by name
             yield conn
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
             logger.error(f"Database connection error: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
+    
+    def _insert_keywords(self, cursor, keyword_rows):
+        """Write (application id, keyword list) pairs into application_keywords"""
+        cursor.executemany(
+            _SQL_INSERT_KEYWORD,
+            [
+                (app_id, keyword.strip().lower())
+                for app_id, keywords in keyword_rows
+                for keyword in keywords if keyword.strip()
+            ]
+        )
+    
+    def _existing_keys(self, keys: List[Tuple[str, str]]) -> set:
+        """Return which (project_id, borough) pairs are already stored, via a reader"""
+        existing = set()
+        
+        with self.get_reader() as conn:
+            for start in range(0, len(keys), KEY_CHUNK_SIZE):
+                chunk = keys[start:start + KEY_CHUNK_SIZE]
+                placeholders = ",".join(["(?,?)"] * len(chunk))
+                cursor = conn.execute(
+                    "SELECT project_id, borough FROM planning_applications "
+                    f"WHERE (project_id, borough) IN (VALUES {placeholders})",
+                    [value for key in chunk for value in key]
+                )
+                # Rows compare unequal to tuples, so store plain (project_id, borough) pairs
+                existing.update(map(tuple, cursor.fetchall()))
+        
+        return existing
     
     def insert_planning_application(self, application_data: Dict) -> bool:
         """Insert a single planning application into the database"""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT OR IGNORE INTO planning_applications 
-                    (project_id, borough, title, address, submission_date, 
-                     application_url, detected_keywords, scraped_timestamp, source_url)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    application_data.get('project_id'),
-                    application_data.get('borough'),
-                    application_data.get('title'),
-                    application_data.get('address'),
-                    application_data.get('submission_date'),
-                    application_data.get('application_url'),
-                    ', '.join(application_data.get('detected_keywords', [])),
-                    datetime.now().isoformat(),
-                    application_data.get('source_url')
-                ))
-                
-                conn.commit()
-                return cursor.rowcount > 0
-                
-        except sqlite3.Error as e:
-            logger.error(f"Error inserting application: {e}")
-            return False
+        # One row of the bulk path; callers inserting many rows should batch them there
+        return self.bulk_insert_applications([application_data])[1] > 0
     
     def bulk_insert_applications(self, applications: List[Dict]) -> Tuple[int, int]:
         """Insert multiple planning applications, return (total, new) counts"""
         total_count = len(applications)
         new_count = 0
         
+        # One timestamp for the whole batch, parameters built up front for executemany
+        now = datetime.now().isoformat()
+        params = []
+        keywords_by_key = {}
+        for app in applications:
+            # Keywords may arrive as a list or already joined in the stored ', ' form
+            keywords = app.get('detected_keywords') or ()
+            if isinstance(keywords, str):
+                joined, keywords = keywords, keywords.split(',')
+            else:
+                joined = ', '.join(keywords)
+            
+            # map() over the bound get runs the field lookups in C
+            values = tuple(map(app.get, _APP_FIELDS))
+            keywords_by_key.setdefault(values[:2], keywords)
+            params.append(values + (joined, now, app.get('source_url')))
+        
         try:
-            with self.get_connection() as conn:
+            # Re-scrapes are mostly duplicates: drop known rows with a read so the
+            # writer lock is only taken, and held, for genuinely new applications
+            existing = self._existing_keys(list(keywords_by_key))
+            params = [row for row in params if (row[0], row[1]) not in existing]
+            if not params:
+                logger.info(f"Bulk insert completed: 0 new out of {total_count} total")
+                return total_count, 0
+            
+            with self.get_writer() as conn:
                 cursor = conn.cursor()
                 
-                for app in applications:
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO planning_applications 
-                        (project_id, borough, title, address, submission_date, 
-                         application_url, detected_keywords, scraped_timestamp, source_url)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        app.get('project_id'),
-                        app.get('borough'),
-                        app.get('title'),
-                        app.get('address'),
-                        app.get('submission_date'),
-                        app.get('application_url'),
-                        ', '.join(app.get('detected_keywords', [])),
-                        datetime.now().isoformat(),
-                        app.get('source_url')
-                    ))
+                # The whole batch is one transaction, so one journal sync instead of one per row;
+                # inside transaction() it joins the caller's transaction instead
+                nested = conn.in_transaction
+                if not nested:
+                    cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    # AUTOINCREMENT ids only grow, so this batch's new rows are the ones above it
+                    # (executemany's rowcount isn't per row, so this also gives the new count)
+                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM planning_applications")
+                    max_id_before = cursor.fetchone()[0]
+                    
+                    cursor.executemany(_SQL_INSERT_APP, params)
                     
-                    if cursor.rowcount > 0:
-                        new_count += 1
+                    cursor.execute(
+                        "SELECT id, project_id, borough FROM planning_applications WHERE id > ?",
+                        (max_id_before,)
+                    )
+                    new_rows = cursor.fetchall()
+                    self._insert_keywords(cursor, [
+                        (app_id, keywords_by_key.get((project_id, borough), []))
+                        for app_id, project_id, borough in new_rows
+                    ])
+                    
+                    if not nested:
+                        cursor.execute("COMMIT")
+                except sqlite3.Error:
+                    if not nested:
+                        cursor.execute("ROLLBACK")
+                    raise
                 
-                conn.commit()
+                new_count = len(new_rows)
                 logger.info(f"Bulk insert completed: {new_count} new out of {total_count} total")
                 return total_count, new_count
                 
         except sqlite3.Error as e:
             logger.error(f"Error in bulk insert: {e}")
+            if self._in_transaction():
+                raise  # let transaction() roll the whole unit back
             return total_count, 0
     
     def log_scraping_session(self, borough: str, records_found: int, 
                            records_new: int, status: str, error_message: str = None):
-        """Log scraping session results"""
+        """Queue a scraping session result; queued logs are written in batches"""
+        row = (
+            borough,
+            datetime.now().isoformat(),
+            records_found,
+            records_new,
+            status,
+            error_message
+        )
+        
+        # Inside transaction() the row commits together with the caller's other writes
+        if self._in_transaction():
+            self._writer.execute(_SQL_INSERT_LOG, row)
+            return
+        
+        with self._log_lock:
+            self._pending_logs.append(row)
+            should_flush = len(self._pending_logs) >= self._log_flush_threshold
+        
+        if should_flush:
+            self.flush_logs()
+    
+    def flush_logs(self):
+        """Write all queued scraping logs in a single transaction"""
+        with self._log_lock:
+            pending, self._pending_logs = self._pending_logs, []
+        
+        if not pending:
+            return
+        
         try:
-            with self.get_connection() as conn:
+            with self.get_writer() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    INSERT INTO scraping_logs 
-                    (borough, scrape_timestamp, records_found, records_new, status, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    borough,
-                    datetime.now().isoformat(),
-                    records_found,
-                    records_new,
-                    status,
-                    error_message
-                ))
-                
-                conn.commit()
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(_SQL_INSERT_LOG, pending)
+                cursor.execute("COMMIT")
                 
         except sqlite3.Error as e:
-            logger.error(f"Error logging scraping session: {e}")
+            logger.error(f"Error logging scraping sessions: {e}")
+            # Keep the rows so the next flush can retry them
+            with self._log_lock:
+                self._pending_logs[:0] = pending
+    
+    def close(self):
+        """Flush queued logs and close this database's connections"""
+        self.flush_logs()
+        
+        # Readers opened by worker threads are closed too, not just the calling thread's
+        with self._readers_lock:
+            readers = list(self._open_readers)
+            self._open_readers.clear()
+        for reader in readers:
+            reader.close()
+        self._readers.holder = None
+        
+        with self._write_lock:
+            self._writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def _applications_query(self, borough: str = None, keyword: str = None,
+                            date_from: str = None, date_to: str = None,
+                            limit: int = None, columns: Optional[Sequence[str]] = None) -> Tuple[str, List]:
+        """Build the filtered, newest-first applications query and its parameters"""
+        if columns:
+            unknown = set(columns) - _ALLOWED_COLS
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+            projection = ", ".join(f"planning_applications.{column}" for column in columns)
+        else:
+            projection = "planning_applications.*"
+        
+        query = f"SELECT {projection} FROM planning_applications"
+        params = []
+        
+        if keyword:
+            # Substring match, as on the old detected_keywords column ('noise' finds
+            # 'noise monitoring'), but scanning only the small junction table
+            query += """
+                WHERE planning_applications.id IN (
+                    SELECT application_id FROM application_keywords WHERE keyword LIKE ?
+                )"""
+            params.append(f"%{keyword.lower()}%")
+        else:
+            query += " WHERE 1=1"
+        
+        if borough:
+            query += " AND borough = ?"
+            params.append(borough)
+        
+        if date_from:
+            query += " AND submission_date >= ?"
+            params.append(date_from)
+        
+        if date_to:
+            query += " AND submission_date <= ?"
+            params.append(date_to)
+        
+        query += " ORDER BY submission_date DESC"
+        
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        return query, params
     
     def get_applications(self, borough: str = None, keyword: str = None, 
-                        date_from: str = None, date_to: str = None) -> pd.DataFrame:
-        """Retrieve planning applications with optional filters"""
+                        date_from: str = None, date_to: str = None,
+                        limit: int = None, chunksize: int = None,
+                        columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Retrieve planning applications with optional filters, newest first, up to limit rows"""
         try:
-            with self.get_connection() as conn:
-                query = "SELECT * FROM planning_applications WHERE 1=1"
-                params = []
-                
-                if borough:
-                    query += " AND borough = ?"
-                    params.append(borough)
-                
-                if keyword:
-                    query += " AND detected_keywords LIKE ?"
-                    params.append(f"%{keyword}%")
-                
-                if date_from:
-                    query += " AND submission_date >= ?"
-                    params.append(date_from)
-                
-                if date_to:
-                    query += " AND submission_date <= ?"
-                    params.append(date_to)
+            with self.get_reader() as conn:
+                query, params = self._applications_query(borough, keyword, date_from, date_to, limit, columns)
                 
-                query += " ORDER BY submission_date DESC"
+                if chunksize:
+                    # Reading in chunks keeps pandas' intermediate copies to one chunk at a time
+                    chunks = pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+                    return pd.concat(chunks, ignore_index=True)
                 
                 return pd.read_sql_query(query, conn, params=params)
                 
@@ -220,16 +509,40 @@ class PlanningDatabase:
             logger.error(f"Error retrieving applications: {e}")
             return pd.DataFrame()
     
+    def iter_applications(self, borough: str = None, keyword: str = None,
+                          columns: Optional[Sequence[str]] = None,
+                          chunksize: int = EXPORT_CHUNKSIZE):
+        """Yield filtered applications as DataFrames of at most chunksize rows"""
+        with self.get_reader() as conn:
+            query, params = self._applications_query(borough, keyword, columns=columns)
+            yield from pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+    
     def get_statistics(self) -> Dict:
         """Get database statistics"""
+        # Queued scraping logs feed last_scrapes, so write them first
+        self.flush_logs()
+        
         try:
-            with self.get_connection() as conn:
+            with self.get_reader() as conn:
                 cursor = conn.cursor()
                 
                 # Total applications
                 cursor.execute("SELECT COUNT(*) FROM planning_applications")
                 total_apps = cursor.fetchone()[0]
                 
+                # Applications by keyword, straight off the junction table's primary key
+                from config import MONITORING_KEYWORDS, MONITORING_KEYWORDS_LOWER
+                cursor.execute("""
+                    SELECT keyword, COUNT(*) 
+                    FROM application_keywords 
+                    GROUP BY keyword
+                """)
+                counts = dict(cursor.fetchall())
+                keyword_stats = {
+                    keyword: counts.get(keyword_lower, 0)
+                    for keyword, keyword_lower in zip(MONITORING_KEYWORDS, MONITORING_KEYWORDS_LOWER)
+                }
+                
                 # Applications by borough
                 cursor.execute("""
                     SELECT borough, COUNT(*) 
@@ -238,16 +551,6 @@ class PlanningDatabase:
                 """)
                 by_borough = dict(cursor.fetchall())
                 
-                # Applications by keyword
-                keyword_stats = {}
-                from config import MONITORING_KEYWORDS
-                for keyword in MONITORING_KEYWORDS:
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM planning_applications 
-                        WHERE detected_keywords LIKE ?
-                    """, (f"%{keyword}%",))
-                    keyword_stats[keyword] = cursor.fetchone()[0]
-                
                 # Recent scraping activity
                 cursor.execute("""
                     SELECT borough, MAX(scrape_timestamp) as last_scrape
@@ -267,12 +570,24 @@ class PlanningDatabase:
             logger.error(f"Error getting statistics: {e}")
             return {}
     
+    def _export_columns(self, columns: Optional[Sequence[str]] = None) -> List[str]:
+        """Column names an export writes, for the header of an export with no rows"""
+        if columns:
+            return list(columns)
+        with self.get_reader() as conn:
+            return [row[1] for row in conn.execute("PRAGMA table_info(planning_applications)")]
+    
     def export_to_csv(self, filename: str, borough: str = None, 
-                     keyword: str = None) -> bool:
-        """Export data to CSV file"""
+                     keyword: str = None, columns: Optional[Sequence[str]] = None) -> bool:
+        """Export data to CSV file, optionally only the given columns"""
         try:
-            df = self.get_applications(borough=borough, keyword=keyword)
-            df.to_csv(filename, index=False)
+            chunks = 0
+            for i, chunk in enumerate(self.iter_applications(borough=borough, keyword=keyword, columns=columns)):
+                chunk.to_csv(filename, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+                chunks += 1
+            if not chunks:
+                # No matching rows: still write the header so the file exists
+                pd.DataFrame(columns=self._export_columns(columns)).to_csv(filename, index=False)
             logger.info(f"Data exported to {filename}")
             return True
         except Exception as e:
@@ -280,11 +595,31 @@ class PlanningDatabase:
             return False
     
     def export_to_excel(self, filename: str, borough: str = None, 
-                       keyword: str = None) -> bool:
-        """Export data to Excel file"""
+                       keyword: str = None, columns: Optional[Sequence[str]] = None) -> bool:
+        """Export data to Excel file, optionally only the given columns"""
+        if not OPENPYXL_AVAILABLE:
+            logger.error("Excel export requires openpyxl (pip install openpyxl)")
+            return False
+        
         try:
-            df = self.get_applications(borough=borough, keyword=keyword)
-            df.to_excel(filename, index=False, engine='openpyxl')
+            # Write-only workbooks stream rows to disk instead of keeping every cell
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet('Sheet1')
+            
+            header_written = False
+            for chunk in self.iter_applications(borough=borough, keyword=keyword, columns=columns):
+                if not header_written:
+                    sheet.append(list(chunk.columns))
+                    header_written = True
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                for row in chunk.itertuples(index=False, name=None):
+                    sheet.append(row)
+            
+            if not header_written:
+                # No matching rows: still write the header so the file exists
+                sheet.append(self._export_columns(columns))
+            
+            workbook.save(filename)
             logger.info(f"Data exported to {filename}")
             return True
         except Exception as e:
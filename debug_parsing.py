@@ -4,7 +4,16 @@ Debug Westminster search results HTML structure
 """
 
 import requests
-from bs4 import BeautifulSoup
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Class names that suggest a results container
+RESULT_CLASS_RE = re.compile(r'result|search', re.IGNORECASE)
+
+# The search page is only read for its hidden CSRF input
+CSRF_STRAINER = SoupStrainer('input', attrs={'name': '_csrf'})
+# Short strings containing a digit look like application references
+APP_REF_RE = re.compile(r'(?=.*\d).{6,49}', re.DOTALL)
 
 def debug_westminster_results():
     print("🔍 DEBUGGING WESTMINSTER SEARCH RESULTS")
@@ -26,7 +35,7 @@ def debug_westminster_results():
     try:
         # Get CSRF token
         response = session.get(search_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=CSRF_STRAINER)
         csrf_token = soup.find('input', {'name': '_csrf'}).get('value')
         
         # Submit search
@@ -45,11 +54,11 @@ def debug_westminster_results():
         print(f"Response code: {search_response.status_code}")
         
         if search_response.status_code == 200:
-            soup = BeautifulSoup(search_response.content, 'html.parser')
+            soup = BeautifulSoup(search_response.content, 'lxml')
             
-            # Save full HTML for analysis
-            with open('debug_results.html', 'w', encoding='utf-8') as f:
-                f.write(str(soup.prettify()))
+            # Save full HTML for analysis (raw bytes, no re-serialising the parsed tree)
+            with open('debug_results.html', 'wb') as f:
+                f.write(search_response.content)
             print("✅ Full HTML saved to debug_results.html")
             
             # Analyze structure
@@ -103,7 +112,7 @@ def debug_westminster_results():
                 
             # Look for divs that might contain results
             print("\n📦 Looking for result divs:")
-            result_divs = soup.find_all('div', class_=lambda x: x and ('result' in str(x).lower() or 'search' in str(x).lower()))
+            result_divs = soup.find_all('div', class_=RESULT_CLASS_RE)
             print(f"Found {len(result_divs)} potential result divs")
             
             for div in result_divs[:3]:  # First 3
@@ -114,14 +123,13 @@ def debug_westminster_results():
                 
             # Look for specific application references
             print("\n🔍 Looking for application references:")
-            app_refs = soup.find_all(text=lambda text: text and any(
-                char.isdigit() for char in text
-            ) and len(text) > 5 and len(text) < 50)
-            
-            for ref in app_refs[:10]:  # First 10
-                ref_clean = ref.strip()
-                if ref_clean and not ref_clean.isspace():
-                    print(f"  Potential ref: '{ref_clean}'")
+            shown = 0
+            for text in soup.stripped_strings:
+                if APP_REF_RE.fullmatch(text):
+                    print(f"  Potential ref: '{text}'")
+                    shown += 1
+                    if shown == 10:  # First 10
+                        break
                     
         else:
             print(f"❌ Error response: {search_response.status_code}")
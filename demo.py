@@ -20,7 +20,7 @@ def create_sample_data():
     # Initialize database
     db = PlanningDatabase()
     
-    # Sample application data
+    # Sample application data (keywords pre-joined in the stored ', ' form)
     sample_applications = [
         {
             'project_id': '2024/001234/PA',
@@ -29,7 +29,7 @@ def create_sample_data():
             'address': '123 Camden High Street, London NW1 7JN',
             'submission_date': '2024-01-15',
             'application_url': 'https://camdenpas.camden.gov.uk/online-applications/application-details/2024/001234/PA',
-            'detected_keywords': ['noise monitoring'],
+            'detected_keywords': 'noise monitoring',
             'source_url': 'https://camdenpas.camden.gov.uk/online-applications/search'
         },
         {
@@ -39,7 +39,7 @@ def create_sample_data():
             'address': '456 Oxford Street, London W1C 1AP',
             'submission_date': '2024-01-20',
             'application_url': 'https://idoxpa.westminster.gov.uk/online-applications/application-details/APP/2024/567',
-            'detected_keywords': ['dust monitoring', 'vibration monitoring'],
+            'detected_keywords': 'dust monitoring, vibration monitoring',
             'source_url': 'https://idoxpa.westminster.gov.uk/online-applications/search'
         },
         {
@@ -49,7 +49,7 @@ def create_sample_data():
             'address': '789 King Street, London W6 9NH',
             'submission_date': '2024-02-01',
             'application_url': 'https://public-access.lbhf.gov.uk/online-applications/application-details/24/00789/FUL',
-            'detected_keywords': ['remote monitoring', 'noise monitoring', 'dust monitoring'],
+            'detected_keywords': 'remote monitoring, noise monitoring, dust monitoring',
             'source_url': 'https://public-access.lbhf.gov.uk/online-applications/search'
         },
         {
@@ -59,7 +59,7 @@ def create_sample_data():
             'address': '101 Commercial Street, London E1 6BF',
             'submission_date': '2024-02-10',
             'application_url': 'https://development.towerhamlets.gov.uk/online-applications/application-details/PA/TH/2024/101',
-            'detected_keywords': ['subsidence monitoring'],
+            'detected_keywords': 'subsidence monitoring',
             'source_url': 'https://development.towerhamlets.gov.uk/online-applications/search'
         },
         {
@@ -69,7 +69,7 @@ def create_sample_data():
             'address': '234 Borough High Street, London SE1 1JX',
             'submission_date': '2024-02-15',
             'application_url': 'https://planning.southwark.gov.uk/online-applications/application-details/24/AP/0234',
-            'detected_keywords': ['noise monitoring', 'vibration monitoring'],
+            'detected_keywords': 'noise monitoring, vibration monitoring',
             'source_url': 'https://planning.southwark.gov.uk/online-applications/search'
         },
         {
@@ -79,7 +79,7 @@ def create_sample_data():
             'address': '246 Euston Road, London NW1 2DB',
             'submission_date': '2024-02-20',
             'application_url': 'https://camdenpas.camden.gov.uk/online-applications/application-details/2024/002468/PA',
-            'detected_keywords': ['remote monitoring'],
+            'detected_keywords': 'remote monitoring',
             'source_url': 'https://camdenpas.camden.gov.uk/online-applications/search'
         },
         {
@@ -89,7 +89,7 @@ def create_sample_data():
             'address': '890 Piccadilly, London W1J 9HP',
             'submission_date': '2024-03-01',
             'application_url': 'https://idoxpa.westminster.gov.uk/online-applications/application-details/APP/2024/890',
-            'detected_keywords': ['subsidence monitoring'],
+            'detected_keywords': 'subsidence monitoring',
             'source_url': 'https://idoxpa.westminster.gov.uk/online-applications/search'
         }
     ]
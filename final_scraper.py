@@ -4,30 +4,82 @@ FINAL WORKING WESTMINSTER SCRAPER
 Based on actual HTML structure analysis
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
-import re
-from datetime import datetime
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from westminster_client import (
+    NO_RESULTS_RE, TOO_MANY_RESULTS_RE, ResponseCache, WestminsterClient, application_jsonl
+)
 
-def scrape_westminster_monitoring():
+# Searches run in parallel, but no more than this many at once against the portal
+MAX_CONCURRENT_SEARCHES = 3
+
+# Every application is appended here as soon as its search finishes, so a crash keeps what was found
+RESULTS_JSONL = 'applications.jsonl'
+
+def search_monitoring_term(client, search_term):
+    """Run one search; returns (output lines, applications) so results print in term order"""
+    lines = []
+    log = lines.append
+    applications = []
+    
+    log(f"\n🔍 Searching: '{search_term}'")
+    log("-" * 50)
+    
+    try:
+        # Submit search; the session's CSRF token is fetched once and reused
+        search_response = client.search_page(search_term)
+        if search_response is None:
+            log("   ❌ No CSRF token available from the search page")
+            return lines, applications
+        
+        log(f"   📊 Response: {search_response.status_code}")
+        
+        if search_response.status_code == 200:
+            content = search_response.content
+            
+            if TOO_MANY_RESULTS_RE.search(content):
+                log("   ⚠️ Too many results - trying more specific term")
+                return lines, applications
+                
+            elif NO_RESULTS_RE.search(content):
+                log("   📭 No results found")
+                return lines, applications
+                
+            # Parse results using the correct structure
+            applications = client.parse_results(content, search_term)
+            
+            if not applications:
+                log("   📭 No result items found")
+                return lines, applications
+                
+            log(f"   🎉 Found {len(applications)} applications!")
+            
+            # Show progress
+            for i, application in enumerate(applications, 1):
+                if application.keywords:
+                    log(f"      🎯 {i}. {application.reference}: {', '.join(application.keywords)}")
+                else:
+                    log(f"      📋 {i}. {application.reference}: (no specific keywords)")
+                    
+        elif search_response.status_code == 403:
+            log("   🚫 Blocked (403)")
+            
+        else:
+            log(f"   ❌ Error: {search_response.status_code}")
+            
+    except Exception as e:
+        log(f"   ❌ Exception: {str(e)[:50]}")
+    
+    return lines, applications
+
+def scrape_westminster_monitoring(use_cache=False):
     print("🎉 FINAL WORKING WESTMINSTER SCRAPER")
     print("Extracting real planning applications with monitoring keywords")
     print("=" * 80)
     
-    base_url = "https://idoxpa.westminster.gov.uk"
-    search_url = f"{base_url}/online-applications/search.do"
-    submit_url = f"{base_url}/online-applications/simpleSearchResults.do?action=firstPage"
-    
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    })
+    # With --cache, result pages fetched in the last hour under the same portal
+    # session are replayed; by default every search goes to the portal
+    client = WestminsterClient(cache=ResponseCache() if use_cache else None)
     
     # Search terms that we know return actual monitoring applications
     search_terms = [
@@ -44,164 +96,28 @@ def scrape_westminster_monitoring():
     
     all_applications = []
     
-    for search_term in search_terms:
-        print(f"\n🔍 Searching: '{search_term}'")
-        print("-" * 50)
+    # One search-page fetch provides the CSRF token for every term
+    if not client.get_csrf():
+        print("❌ Can't get a CSRF token from the search page")
+        return all_applications
+    
+    # Searches overlap on the network; results are printed in search-term order
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SEARCHES) as executor, \
+            open(RESULTS_JSONL, 'ab') as output:
+        results = executor.map(lambda term: search_monitoring_term(client, term), search_terms)
         
-        try:
-            # Get search page and CSRF token
-            response = session.get(search_url)
-            if response.status_code != 200:
-                print(f"   ❌ Can't access search page: {response.status_code}")
-                continue
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            csrf_input = soup.find('input', {'name': '_csrf'})
-            if not csrf_input:
-                print("   ❌ No CSRF token found")
-                continue
-                
-            csrf_token = csrf_input.get('value')
-            
-            # Build form data (exact structure we discovered)
-            form_data = {
-                '_csrf': csrf_token,
-                'searchType': 'Application',
-                'searchCriteria.caseStatus': '',
-                'searchCriteria.simpleSearchString': search_term,
-                'searchCriteria.simpleSearch': 'true'
-            }
-            
-            # Submit search
-            session.headers['Referer'] = search_url
-            search_response = session.post(submit_url, data=form_data, timeout=15)
-            
-            print(f"   📊 Response: {search_response.status_code}")
-            
-            if search_response.status_code == 200:
-                content_lower = search_response.text.lower()
-                
-                if "too many results found" in content_lower:
-                    print("   ⚠️ Too many results - trying more specific term")
-                    continue
-                    
-                elif "no results" in content_lower or "no applications found" in content_lower:
-                    print("   📭 No results found")
-                    continue
-                    
-                # Parse results using the correct structure
-                results_soup = BeautifulSoup(search_response.content, 'html.parser')
-                
-                # Find the results list: <ul id="searchresults">
-                results_ul = results_soup.find('ul', id='searchresults')
-                
-                if not results_ul:
-                    print("   ❓ No results list found")
-                    continue
-                    
-                # Find all result items: <li class="searchresult">
-                result_items = results_ul.find_all('li', class_='searchresult')
-                
-                if not result_items:
-                    print("   📭 No result items found")
-                    continue
-                    
-                print(f"   🎉 Found {len(result_items)} applications!")
-                
-                # Parse each result
-                for i, item in enumerate(result_items, 1):
-                    try:
-                        # Get the main link with description
-                        link = item.find('a', class_='summaryLink')
-                        if not link:
-                            continue
-                            
-                        app_url = link.get('href', '')
-                        if app_url and not app_url.startswith('http'):
-                            app_url = f"{base_url}{app_url}"
-                            
-                        # Get description from the div inside the link
-                        desc_div = link.find('div')
-                        description = desc_div.get_text(strip=True) if desc_div else ""
-                        
-                        # Get address
-                        address_p = item.find('p', class_='address')
-                        address = address_p.get_text(strip=True) if address_p else ""
-                        
-                        # Get metadata (reference, dates, status)
-                        meta_p = item.find('p', class_='metaInfo')
-                        reference = ""
-                        received_date = ""
-                        status = ""
-                        
-                        if meta_p:
-                            meta_text = meta_p.get_text()
-                            
-                            # Extract reference number
-                            ref_match = re.search(r'Ref\. No:\s*([^\|]+)', meta_text)
-                            if ref_match:
-                                reference = ref_match.group(1).strip()
-                                
-                            # Extract received date
-                            received_match = re.search(r'Received:\s*([^\|]+)', meta_text)
-                            if received_match:
-                                received_date = received_match.group(1).strip()
-                                
-                            # Extract status
-                            status_match = re.search(r'Status:\s*(.+?)(?:\s|$)', meta_text)
-                            if status_match:
-                                status = status_match.group(1).strip()
-                        
-                        # Check for monitoring keywords in description and address
-                        monitoring_keywords = [
-                            'monitoring', 'noise', 'vibration', 'dust', 'subsidence',
-                            'environmental', 'acoustic', 'sound', 'tree monitoring',
-                            'construction management', 'arboricultural', 'supervision'
-                        ]
-                        
-                        combined_text = f"{description} {address}".lower()
-                        found_keywords = [kw for kw in monitoring_keywords if kw in combined_text]
-                        
-                        application = {
-                            'reference': reference,
-                            'address': address,
-                            'description': description,
-                            'status': status,
-                            'received_date': received_date,
-                            'url': app_url,
-                            'search_term': search_term,
-                            'borough': 'Westminster',
-                            'keywords': found_keywords,
-                            'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                        
-                        all_applications.append(application)
-                        
-                        # Show progress
-                        if found_keywords:
-                            print(f"      🎯 {i}. {reference}: {', '.join(found_keywords)}")
-                        else:
-                            print(f"      📋 {i}. {reference}: (no specific keywords)")
-                            
-                    except Exception as e:
-                        print(f"      ❌ Error parsing item {i}: {str(e)[:30]}")
-                        continue
-                        
-            elif search_response.status_code == 403:
-                print("   🚫 Blocked (403)")
-                
-            else:
-                print(f"   ❌ Error: {search_response.status_code}")
-                
-        except Exception as e:
-            print(f"   ❌ Exception: {str(e)[:50]}")
-            
-        time.sleep(3)  # Be polite between searches
+        for lines, applications in results:
+            print("\n".join(lines))
+            output.writelines(application_jsonl(app) for app in applications)
+            output.flush()
+            all_applications.extend(applications)
+    
+    print(f"\n💾 Appended {len(all_applications)} applications to {RESULTS_JSONL}")
     
     return all_applications
 
 def main():
-    applications = scrape_westminster_monitoring()
+    applications = scrape_westminster_monitoring(use_cache='--cache' in sys.argv)
     
     print("\n\n🎯 FINAL RESULTS")
     print("=" * 80)
@@ -210,21 +126,21 @@ def main():
         print(f"📊 Total applications found: {len(applications)}")
         
         # Filter for those with monitoring keywords
-        monitoring_apps = [app for app in applications if app['keywords']]
-        non_monitoring_apps = [app for app in applications if not app['keywords']]
+        monitoring_apps = [app for app in applications if app.keywords]
+        non_monitoring_apps = [app for app in applications if not app.keywords]
         
         if monitoring_apps:
             print(f"\n🎉 {len(monitoring_apps)} APPLICATIONS WITH MONITORING KEYWORDS:")
             print("=" * 60)
             
             for i, app in enumerate(monitoring_apps, 1):
-                print(f"\n{i}. 📋 {app['reference']} ({app['status']})")
-                print(f"   🏠 Address: {app['address']}")
-                print(f"   📝 Description: {app['description'][:100]}{'...' if len(app['description']) > 100 else ''}")
-                print(f"   🎯 Keywords: {', '.join(app['keywords'])}")
-                print(f"   📅 Received: {app['received_date']}")
-                print(f"   🔗 URL: {app['url']}")
-                print(f"   🔍 Found via: '{app['search_term']}'")
+                print(f"\n{i}. 📋 {app.reference} ({app.status})")
+                print(f"   🏠 Address: {app.address}")
+                print(f"   📝 Description: {app.description[:100]}{'...' if len(app.description) > 100 else ''}")
+                print(f"   🎯 Keywords: {', '.join(app.keywords)}")
+                print(f"   📅 Received: {app.received_date}")
+                print(f"   🔗 URL: {app.url}")
+                print(f"   🔍 Found via: '{app.search_term}'")
         
         if non_monitoring_apps:
             print(f"\n📋 {len(non_monitoring_apps)} other applications found (no specific monitoring keywords)")
@@ -4,7 +4,8 @@ Analyze Westminster form fields to find correct field names
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from westminster_client import WestminsterClient
 
 def analyze_form():
     # Try multiple Westminster URLs
@@ -28,7 +29,7 @@ def analyze_form():
             if response.status_code != 200:
                 continue
                 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=SoupStrainer('form'))
             
             forms = soup.find_all('form')
             print(f'   Forms found: {len(forms)}')
@@ -91,12 +92,9 @@ def test_form_submission(url, form, proposal_field):
     print(f'      Testing with field: {proposal_field["name"]}')
     
     try:
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Referer': url
-        })
+        # Same pooled, retrying session the search scripts use
+        session = WestminsterClient().session
+        session.headers['Referer'] = url
         
         # Build form data
         form_data = {}
@@ -3,28 +3,101 @@
 Get actual planning applications using more specific search terms
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
+import lxml.html
 import re
+from datetime import datetime
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from utils import KeywordMatcher
+from westminster_client import (
+    BASE_URL, NO_RESULTS_RE, TOO_MANY_RESULTS_RE, Application, ResponseCache, WestminsterClient,
+    element_text
+)
 
-def get_westminster_applications():
+# Searches run in parallel, but no more than this many at once against the portal
+MAX_CONCURRENT_SEARCHES = 3
+
+# Real application references carry at least a four-digit sequence number
+REF_DIGITS_RE = re.compile(r'[0-9]{4,}')
+APPLICATION_RE = re.compile(rb'(?i)application')
+# Either results layout parse_applications() understands
+RESULTS_MARKUP_RE = re.compile(rb'(?i)searchresult|<table')
+
+MONITORING_MATCHER = KeywordMatcher([
+    'monitoring', 'noise', 'vibration', 'dust', 'subsidence',
+    'environmental', 'acoustic', 'sound', 'construction management'
+])
+
+def search_applications_term(client, search_term):
+    """Run one search; returns (output lines, applications) so results print in term order"""
+    lines = []
+    log = lines.append
+    applications = []
+    
+    log(f"\n🔍 Testing: '{search_term}'")
+    log("-" * 50)
+    
+    try:
+        # Submit search; the session's CSRF token is fetched once and reused
+        search_response = client.search_page(search_term)
+        if search_response is None:
+            log("   ❌ No CSRF token available from the search page")
+            return lines, applications
+        
+        log(f"   📊 Response: {search_response.status_code}")
+        
+        if search_response.status_code == 200:
+            content = search_response.content
+            
+            if TOO_MANY_RESULTS_RE.search(content):
+                log("   ⚠️ Still too many results - trying next term")
+                
+            elif NO_RESULTS_RE.search(content):
+                log("   📭 No results found")
+                
+            elif APPLICATION_RE.search(content):
+                log("   🎉 SUCCESS! Applications found!")
+                
+                # Parse the results
+                applications = parse_applications(client, content, search_term)
+                
+                if applications:
+                    log(f"   📋 Found {len(applications)} applications")
+                    
+                    # Show first few
+                    for i, app in enumerate(applications[:3], 1):
+                        log(f"      {i}. {app.reference}: {app.description[:50]}...")
+                        
+                    # Monitoring matches end the run once this term is reported
+                    monitoring_apps = [app for app in applications if has_monitoring_keywords(app)]
+                    if monitoring_apps:
+                        log(f"   🎯 {len(monitoring_apps)} applications with monitoring keywords!")
+                else:
+                    log("   ❓ Applications found but couldn't parse")
+                    
+            else:
+                log("   ❓ Unknown response format")
+                
+        elif search_response.status_code == 403:
+            log("   🚫 Blocked (403)")
+            
+        else:
+            log(f"   ❌ Error: {search_response.status_code}")
+            
+    except Exception as e:
+        log(f"   ❌ Exception: {str(e)[:50]}")
+    
+    return lines, applications
+
+def get_westminster_applications(use_cache=False):
     print("🎯 GETTING ACTUAL PLANNING APPLICATIONS")
     print("Using more specific search terms")
     print("=" * 80)
     
-    base_url = "https://idoxpa.westminster.gov.uk"
-    search_url = f"{base_url}/online-applications/search.do"
-    submit_url = f"{base_url}/online-applications/simpleSearchResults.do?action=firstPage"
-    
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
+    # With --cache, result pages fetched in the last hour under the same portal
+    # session are replayed; by default every search goes to the portal
+    client = WestminsterClient(cache=ResponseCache() if use_cache else None)
+    client.session.headers.update({
         'Sec-Fetch-Dest': 'document',
         'Sec-Fetch-Mode': 'navigate',
         'Sec-Fetch-Site': 'same-origin'
@@ -46,112 +119,66 @@ def get_westminster_applications():
     
     all_applications = []
     
-    for search_term in specific_terms:
-        print(f"\n🔍 Testing: '{search_term}'")
-        print("-" * 50)
-        
-        try:
-            # Get search page and CSRF token
-            response = session.get(search_url)
-            if response.status_code != 200:
-                print(f"   ❌ Can't access search page: {response.status_code}")
-                continue
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            csrf_input = soup.find('input', {'name': '_csrf'})
-            if not csrf_input:
-                print("   ❌ No CSRF token found")
-                continue
-                
-            csrf_token = csrf_input.get('value')
-            
-            # Build form data
-            form_data = {
-                '_csrf': csrf_token,
-                'searchType': 'Application',
-                'searchCriteria.caseStatus': '',
-                'searchCriteria.simpleSearchString': search_term,
-                'searchCriteria.simpleSearch': 'true'
-            }
-            
-            # Set referer and submit
-            session.headers['Referer'] = search_url
-            search_response = session.post(submit_url, data=form_data, timeout=15)
-            
-            print(f"   📊 Response: {search_response.status_code}")
-            
-            if search_response.status_code == 200:
-                content = search_response.text.lower()
-                
-                if "too many results found" in content:
-                    print("   ⚠️ Still too many results - trying next term")
-                    
-                elif "no results" in content or "no applications found" in content:
-                    print("   📭 No results found")
-                    
-                elif "application" in content:
-                    print("   🎉 SUCCESS! Applications found!")
-                    
-                    # Parse the results
-                    results_soup = BeautifulSoup(search_response.content, 'html.parser')
-                    applications = parse_applications(results_soup, search_term)
-                    
-                    if applications:
-                        all_applications.extend(applications)
-                        print(f"   📋 Found {len(applications)} applications")
-                        
-                        # Show first few
-                        for i, app in enumerate(applications[:3], 1):
-                            print(f"      {i}. {app['reference']}: {app['description'][:50]}...")
-                            
-                        # If we found results with monitoring keywords, we're done!
-                        monitoring_apps = [app for app in applications if has_monitoring_keywords(app)]
-                        if monitoring_apps:
-                            print(f"   🎯 {len(monitoring_apps)} applications with monitoring keywords!")
-                            return all_applications
-                    else:
-                        print("   ❓ Applications found but couldn't parse")
-                        
-                else:
-                    print("   ❓ Unknown response format")
-                    
-            elif search_response.status_code == 403:
-                print("   🚫 Blocked (403)")
-                
-            else:
-                print(f"   ❌ Error: {search_response.status_code}")
-                
-        except Exception as e:
-            print(f"   ❌ Exception: {str(e)[:50]}")
+    # One search-page fetch provides the CSRF token for every term
+    if not client.get_csrf():
+        print("❌ Can't get a CSRF token from the search page")
+        return all_applications
+    
+    # Searches overlap on the network; results are printed in search-term order
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SEARCHES)
+    futures = [executor.submit(search_applications_term, client, term) for term in specific_terms]
+    try:
+        for future in futures:
+            lines, applications = future.result()
+            print("\n".join(lines))
+            all_applications.extend(applications)
             
-        time.sleep(2)  # Be polite
+            # If we found results with monitoring keywords, we're done!
+            if any(has_monitoring_keywords(app) for app in applications):
+                break
+    finally:
+        # Drop searches that haven't started once we have what we need
+        # (cancelled by hand; shutdown's cancel_futures needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
     
     return all_applications
 
-def parse_applications(soup, search_term):
+def parse_applications(client, content, search_term):
     """Parse applications from search results"""
     applications = []
     
+    # A byte scan is far cheaper than building a tree that can't hold any results
+    if not RESULTS_MARKUP_RE.search(content):
+        return applications
+    
     try:
-        # Look for results table
-        tables = soup.find_all('table')
+        tree = lxml.html.fromstring(content)
+        
+        # Idox lists results as <ul id="searchresults">, so go straight to it
+        results = client.parse_results_tree(tree, search_term, MONITORING_MATCHER)
+        if results is not None:
+            return results
         
-        for table in tables:
-            rows = table.find_all('tr')
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Fall back to a results table for older page layouts
+        for table in tree.iter('table'):
+            rows = list(table.iter('tr'))
             
             if len(rows) < 2:  # Need header + data
                 continue
                 
             # Check if this looks like a results table
-            header_row = rows[0]
-            header_text = header_row.get_text().lower()
+            header_text = rows[0].text_content().lower()
             
             if 'application' not in header_text and 'reference' not in header_text:
                 continue
                 
             # Parse data rows
             for row in rows[1:]:
-                cells = row.find_all(['td', 'th'])
+                cells = list(row.iter('td', 'th'))
                 
                 if len(cells) < 3:  # Need at least ref, address, description
                     continue
@@ -159,37 +186,41 @@ def parse_applications(soup, search_term):
                 try:
                     # Extract application data
                     ref_cell = cells[0]
-                    ref_link = ref_cell.find('a')
+                    ref_link = ref_cell.find('.//a')
                     
-                    if ref_link:
-                        app_ref = ref_link.get_text(strip=True)
+                    if ref_link is not None:
+                        app_ref = element_text(ref_link)
                         app_url = ref_link.get('href', '')
                         
                         # Make full URL
                         if app_url and not app_url.startswith('http'):
-                            app_url = f"https://idoxpa.westminster.gov.uk{app_url}"
+                            app_url = f"{BASE_URL}{app_url}"
                     else:
-                        app_ref = ref_cell.get_text(strip=True)
+                        app_ref = element_text(ref_cell)
                         app_url = ""
                     
                     # Get other details
-                    address = cells[1].get_text(strip=True) if len(cells) > 1 else ""
-                    description = cells[2].get_text(strip=True) if len(cells) > 2 else ""
-                    status = cells[3].get_text(strip=True) if len(cells) > 3 else ""
+                    address = element_text(cells[1])
+                    description = element_text(cells[2])
+                    status = element_text(cells[3]) if len(cells) > 3 else ""
                     
                     # Validate application reference format
-                    if not re.search(r'[0-9]{4,}', app_ref):
+                    if not REF_DIGITS_RE.search(app_ref):
                         continue
                         
-                    application = {
-                        'reference': app_ref,
-                        'address': address,
-                        'description': description,
-                        'status': status,
-                        'url': app_url,
-                        'search_term': search_term,
-                        'borough': 'Westminster'
-                    }
+                    combined_text = f"{description} {address}".lower()
+                    application = Application(
+                        reference=app_ref,
+                        address=address,
+                        description=description,
+                        status=status,
+                        received_date="",
+                        url=app_url,
+                        search_term=search_term,
+                        borough='Westminster',
+                        keywords=tuple(MONITORING_MATCHER.find_lowered(combined_text)),
+                        scraped_at=scraped_at
+                    )
                     
                     applications.append(application)
                     
@@ -203,21 +234,10 @@ def parse_applications(soup, search_term):
 
 def has_monitoring_keywords(application):
     """Check if application contains monitoring keywords"""
-    monitoring_keywords = [
-        'monitoring', 'noise', 'vibration', 'dust', 'subsidence',
-        'environmental', 'acoustic', 'sound', 'construction management'
-    ]
-    
-    text_to_search = f"{application['description']} {application['address']}".lower()
-    
-    for keyword in monitoring_keywords:
-        if keyword in text_to_search:
-            return True
-            
-    return False
+    return bool(application.keywords)
 
 if __name__ == "__main__":
-    applications = get_westminster_applications()
+    applications = get_westminster_applications(use_cache='--cache' in sys.argv)
     
     print("\n\n🎯 FINAL RESULTS")
     print("=" * 80)
@@ -232,12 +252,12 @@ if __name__ == "__main__":
             print(f"🎉 {len(monitoring_apps)} applications with monitoring keywords:")
             
             for i, app in enumerate(monitoring_apps, 1):
-                print(f"\n{i}. 📋 {app['reference']}")
-                print(f"   Address: {app['address']}")
-                print(f"   Description: {app['description']}")
-                print(f"   Status: {app['status']}")
-                print(f"   URL: {app['url']}")
-                print(f"   Found via: {app['search_term']}")
+                print(f"\n{i}. 📋 {app.reference}")
+                print(f"   Address: {app.address}")
+                print(f"   Description: {app.description}")
+                print(f"   Status: {app.status}")
+                print(f"   URL: {app.url}")
+                print(f"   Found via: {app.search_term}")
         else:
             print("📋 No applications with specific monitoring keywords found")
             print("But found applications - try broader search terms")
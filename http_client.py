@@ -0,0 +1,30 @@
+"""
+Shared HTTP session factory for the scraping scripts
+Every session gets a pooled keep-alive adapter that retries transient failures
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 32
+RETRY_STATUSES = [429, 502, 503, 504]
+
+def mount_pooled_adapter(session):
+    """Keep connections warm and retry transient failures with backoff"""
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=RETRY_STATUSES)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+def build_session(headers=None) -> requests.Session:
+    """A new pooled, retrying session, optionally with extra default headers"""
+    session = mount_pooled_adapter(requests.Session())
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -3,191 +3,198 @@
 Integrate Westminster monitoring applications into the main database
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
-import re
+import sys
+from urllib3.util.request import ACCEPT_ENCODING
+import lxml.html
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from database import PlanningDatabase
+from http_client import build_session
+from utils import RateLimiter
+from westminster_client import (
+    BASE_URL, SEARCH_URL, MONITORING_MATCHER, NO_RESULTS_RE, RESULT_ITEM_XPATH, RESULTS_LIST_XPATH,
+    TOO_MANY_RESULTS_RE, element_text, fetch_csrf, first, item_parts, parse_meta, submit_search
+)
 
-def scrape_and_save_westminster():
-    print("🎯 INTEGRATING WESTMINSTER MONITORING APPLICATIONS")
-    print("Scraping and saving to main database")
-    print("=" * 80)
-    
-    # Initialize database connection
-    db = PlanningDatabase()
-    
-    base_url = "https://idoxpa.westminster.gov.uk"
-    search_url = f"{base_url}/online-applications/search.do"
-    submit_url = f"{base_url}/online-applications/simpleSearchResults.do?action=firstPage"
-    
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    })
-    
-    # Search terms for monitoring applications
-    search_terms = [
-        "monitoring",
-        "tree monitoring", 
-        "noise monitoring",
-        "environmental monitoring"
-    ]
+# Searches run in parallel, but no more than this many at once against the portal
+MAX_CONCURRENT_SEARCHES = 2
+SEARCH_INTERVAL = 1.5
+
+def scrape_term(session, search_term, rate_limiter):
+    """Search one term; returns (output lines, matched rows, outcome) so results print in term order.
+    The outcome is 'ok', 'empty' (portal reported no results), 'too_broad' or 'failed'"""
+    lines = []
+    log = lines.append
+    pending = []
     
-    saved_count = 0
+    log(f"\n🔍 Processing: '{search_term}'")
+    log("-" * 50)
     
-    for search_term in search_terms:
-        print(f"\n🔍 Processing: '{search_term}'")
-        print("-" * 50)
+    try:
+        # Submit search; the session's CSRF token is fetched once and reused,
+        # and refreshed only if the portal rejects it
+        rate_limiter.wait()
+        search_response = submit_search(session, search_term)
+        if search_response is None:
+            log("   ❌ No CSRF token available from the search page")
+            return lines, pending, 'failed'
         
-        try:
-            # Get search page and CSRF token
-            response = session.get(search_url)
-            if response.status_code != 200:
-                print(f"   ❌ Can't access search page: {response.status_code}")
-                continue
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            csrf_input = soup.find('input', {'name': '_csrf'})
-            if not csrf_input:
-                print("   ❌ No CSRF token found")
-                continue
-                
-            csrf_token = csrf_input.get('value')
+        if search_response.status_code != 200:
+            log(f"   ❌ Search failed: {search_response.status_code}")
+            return lines, pending, 'failed'
+            
+        # Banners are matched on the raw bytes; the same bytes then go to lxml
+        content = search_response.content
+        
+        if TOO_MANY_RESULTS_RE.search(content):
+            log("   ⚠️ Too many results - skipping")
+            return lines, pending, 'too_broad'
             
-            # Build form data
-            form_data = {
-                '_csrf': csrf_token,
-                'searchType': 'Application',
-                'searchCriteria.caseStatus': '',
-                'searchCriteria.simpleSearchString': search_term,
-                'searchCriteria.simpleSearch': 'true'
-            }
+        if NO_RESULTS_RE.search(content):
+            log("   📭 No results found")
+            return lines, pending, 'empty'
             
-            # Submit search
-            session.headers['Referer'] = search_url
-            search_response = session.post(submit_url, data=form_data, timeout=15)
+        # Parse results; the lookups below run as compiled XPath and lxml walks in C
+        results_tree = lxml.html.fromstring(content)
+        results_ul = first(RESULTS_LIST_XPATH(results_tree))
+        
+        if results_ul is None:
+            log("   ❓ No results list found")
+            return lines, pending, 'failed'
             
-            if search_response.status_code != 200:
-                print(f"   ❌ Search failed: {search_response.status_code}")
-                continue
-                
-            content_lower = search_response.text.lower()
+        result_items = RESULT_ITEM_XPATH(results_ul)
+        
+        if not result_items:
+            log("   📭 No result items found")
+            return lines, pending, 'failed'
             
-            if "too many results found" in content_lower:
-                print("   ⚠️ Too many results - skipping")
-                continue
+        log(f"   🎉 Found {len(result_items)} applications!")
+        
+        # Process each result
+        for i, item in enumerate(result_items, 1):
+            try:
+                # Extract application data
+                link, address_p, meta_p = item_parts(item)
+                if link is None:
+                    continue
+                    
+                app_url = link.get('href', '')
+                if app_url and not app_url.startswith('http'):
+                    app_url = f"{BASE_URL}{app_url}"
+                    
+                description = element_text(link.find('.//div'))
+                address = element_text(address_p)
                 
-            if "no results" in content_lower:
-                print("   📭 No results found")
-                continue
+                # Get metadata
+                reference = ""
+                received_date = ""
+                status = ""
                 
-            # Parse results
-            results_soup = BeautifulSoup(search_response.content, 'html.parser')
-            results_ul = results_soup.find('ul', id='searchresults')
-            
-            if not results_ul:
-                print("   ❓ No results list found")
-                continue
+                if meta_p is not None:
+                    reference, received_date, status = parse_meta(meta_p.text_content())
                 
-            result_items = results_ul.find_all('li', class_='searchresult')
-            
-            if not result_items:
-                print("   📭 No result items found")
+                # Check for monitoring keywords (lowercased once, matched in one pass)
+                combined_text = f"{description} {address}".lower()
+                found_keywords = MONITORING_MATCHER.find_lowered(combined_text)
+                
+                if not found_keywords:
+                    continue  # Skip applications without monitoring keywords
+                
+                # Queue for the database using the correct field mapping
+                pending.append({
+                    'project_id': reference,
+                    'borough': 'Westminster',
+                    'title': description,
+                    'address': address,
+                    'submission_date': received_date,
+                    'application_url': app_url,
+                    'detected_keywords': found_keywords,
+                    'source_url': BASE_URL
+                })
+                log(f"      🎯 {reference}: {', '.join(found_keywords)}")
+                
+            except Exception as e:
+                log(f"      ❌ Error parsing item {i}: {str(e)[:30]}")
                 continue
                 
-            print(f"   🎉 Found {len(result_items)} applications!")
+    except Exception as e:
+        log(f"   ❌ Exception: {str(e)[:50]}")
+        return lines, pending, 'failed'
+        
+    return lines, pending, 'ok'
+
+def scrape_and_save_westminster():
+    print("🎯 INTEGRATING WESTMINSTER MONITORING APPLICATIONS")
+    print("Scraping and saving to main database")
+    print("=" * 80)
+    
+    # One database connection for the whole run, closed (and logs flushed) on exit
+    with PlanningDatabase() as db:
+        session = build_session({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        })
+        
+        # Search terms for monitoring applications, broadest first: every narrower
+        # term's results are a subset of the first one's
+        search_terms = [
+            "monitoring",
+            "tree monitoring", 
+            "noise monitoring",
+            "environmental monitoring"
+        ]
+        
+        saved_count = 0
+        seen_references = set()
+        
+        # Be polite: searches start at least SEARCH_INTERVAL apart across both workers,
+        # with time spent waiting on responses counted towards the gap
+        rate_limiter = RateLimiter(SEARCH_INTERVAL)
+        
+        # One search-page fetch provides the CSRF token for every term
+        session.headers['Referer'] = SEARCH_URL
+        if not fetch_csrf(session):
+            print("❌ Can't get a CSRF token from the search page")
+            return saved_count
+        
+        def save(lines, pending):
+            # Matches are saved with one bulk insert (one transaction) per term;
+            # applications already saved under an earlier term are skipped
+            nonlocal saved_count
+            pending = [app for app in pending if app['project_id'] not in seen_references]
+            seen_references.update(app['project_id'] for app in pending)
             
-            # Process each result
-            for i, item in enumerate(result_items, 1):
+            if pending:
                 try:
-                    # Extract application data
-                    link = item.find('a', class_='summaryLink')
-                    if not link:
-                        continue
-                        
-                    app_url = link.get('href', '')
-                    if app_url and not app_url.startswith('http'):
-                        app_url = f"{base_url}{app_url}"
-                        
-                    desc_div = link.find('div')
-                    description = desc_div.get_text(strip=True) if desc_div else ""
-                    
-                    address_p = item.find('p', class_='address')
-                    address = address_p.get_text(strip=True) if address_p else ""
-                    
-                    # Get metadata
-                    meta_p = item.find('p', class_='metaInfo')
-                    reference = ""
-                    received_date = ""
-                    status = ""
-                    
-                    if meta_p:
-                        meta_text = meta_p.get_text()
-                        
-                        ref_match = re.search(r'Ref\. No:\s*([^\|]+)', meta_text)
-                        if ref_match:
-                            reference = ref_match.group(1).strip()
-                            
-                        received_match = re.search(r'Received:\s*([^\|]+)', meta_text)
-                        if received_match:
-                            received_date = received_match.group(1).strip()
-                            
-                        status_match = re.search(r'Status:\s*(.+?)(?:\s|$)', meta_text)
-                        if status_match:
-                            status = status_match.group(1).strip()
-                    
-                    # Check for monitoring keywords
-                    monitoring_keywords = [
-                        'monitoring', 'noise', 'vibration', 'dust', 'subsidence',
-                        'environmental', 'acoustic', 'sound', 'tree monitoring',
-                        'construction management', 'arboricultural', 'supervision'
-                    ]
-                    
-                    combined_text = f"{description} {address}".lower()
-                    found_keywords = [kw for kw in monitoring_keywords if kw in combined_text]
-                    
-                    if not found_keywords:
-                        continue  # Skip applications without monitoring keywords
-                    
-                    # Save to database using correct method and field mapping
-                    try:
-                        application_data = {
-                            'project_id': reference,
-                            'borough': 'Westminster',
-                            'title': description,
-                            'address': address,
-                            'submission_date': received_date,
-                            'application_url': app_url,
-                            'detected_keywords': found_keywords,
-                            'source_url': base_url
-                        }
-                        
-                        success = db.insert_planning_application(application_data)
-                        
-                        if success:
-                            saved_count += 1
-                            print(f"      ✅ {saved_count}. {reference}: {', '.join(found_keywords)}")
-                        else:
-                            print(f"      🔄 {reference}: Already exists (skipping)")
-                        
-                    except Exception as e:
-                        print(f"      ❌ Error saving {reference}: {str(e)[:50]}")
-                        
+                    total, new = db.bulk_insert_applications(pending)
+                    saved_count += new
+                    lines.append(f"   ✅ Saved {new} new of {total} matches ({total - new} already stored)")
                 except Exception as e:
-                    print(f"      ❌ Error parsing item {i}: {str(e)[:30]}")
-                    continue
-                    
-        except Exception as e:
-            print(f"   ❌ Exception: {str(e)[:50]}")
+                    lines.append(f"   ❌ Error saving {len(pending)} applications: {str(e)[:50]}")
             
-        time.sleep(2)  # Be polite between searches
+            # One write per term rather than one print per matched row
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+        
+        # The broad term alone is enough when it returned its results; if the portal
+        # said too many, or the search failed or came back empty, the narrower terms run
+        broad_term, narrower_terms = search_terms[0], search_terms[1:]
+        lines, pending, outcome = scrape_term(session, broad_term, rate_limiter)
+        save(lines, pending)
+        
+        if outcome == 'ok':
+            print(f"\n⏭️ '{broad_term}' already covers {len(narrower_terms)} narrower terms - skipping them")
+        else:
+            # Narrower terms are searched two at a time and saved in term order
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SEARCHES) as executor:
+                results = executor.map(lambda term: scrape_term(session, term, rate_limiter), narrower_terms)
+                
+                for lines, pending, _ in results:
+                    save(lines, pending)
     
     print(f"\n\n🎯 INTEGRATION COMPLETE")
     print("=" * 40)
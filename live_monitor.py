@@ -4,34 +4,52 @@ Live command-line monitoring tool for scrapers
 Shows real-time activity and tests different scraping approaches
 """
 
+import sys
 import time
 import threading
 from datetime import datetime
+from collections import defaultdict
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from scraper_manager import ScrapingManager
-import requests
+from http_client import build_session
 from config import BOROUGHS_CONFIG
 
+# Changes arriving faster than this are folded into one status poll and redraw; the
+# database statistics in each poll are only re-queried every DB_STATS_INTERVAL (5s)
+MIN_REDRAW_INTERVAL = 1.0
+
 class LiveMonitor:
     def __init__(self):
         self.manager = ScrapingManager()
         self.running = False
         
-    def print_status(self):
+        # One keep-alive session, so repeat probes of a host skip the TCP/TLS handshake
+        self.session = build_session({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        })
+        
+    def print_status(self, status=None):
         """Print current status"""
-        print("\n" + "="*80)
-        print(f"🕐 {datetime.now().strftime('%H:%M:%S')} - LIVE SCRAPER MONITOR")
-        print("="*80)
+        # The whole frame is built first and written in one call
+        lines = []
+        out = lines.append
         
-        status = self.manager.get_scraping_status()
+        out("\n" + "="*80)
+        out(f"🕐 {datetime.now().strftime('%H:%M:%S')} - LIVE SCRAPER MONITOR")
+        out("="*80)
         
-        print(f"\n📊 SYSTEM STATUS:")
-        print(f"   Total Boroughs: {status['total_boroughs']}")
-        print(f"   Active Scrapers: {status['active_scrapers']}")
-        print(f"   Completed: {status['completed_scrapers']}")
-        print(f"   Errors: {status['error_scrapers']}")
-        print(f"   Overall Progress: {status['overall_progress']:.1f}%")
+        if status is None:
+            status = self.manager.get_scraping_status()
         
-        print(f"\n🏛️ BOROUGH STATUS:")
+        out(f"\n📊 SYSTEM STATUS:")
+        out(f"   Total Boroughs: {status['total_boroughs']}")
+        out(f"   Active Scrapers: {status['active_scrapers']}")
+        out(f"   Completed: {status['completed_scrapers']}")
+        out(f"   Errors: {status['error_scrapers']}")
+        out(f"   Overall Progress: {status['overall_progress']:.1f}%")
+        
+        out(f"\n🏛️ BOROUGH STATUS:")
         for borough, info in status['boroughs'].items():
             status_emoji = {
                 'initialized': '⚪',
@@ -43,38 +61,76 @@ class LiveMonitor:
             progress = info.get('progress_percentage', 0)
             current_keyword = info.get('current_keyword', 'None')
             
-            print(f"   {status_emoji} {borough:20} | Status: {info['status']:10} | Progress: {progress:5.1f}% | Keyword: {current_keyword}")
+            out(f"   {status_emoji} {borough:20} | Status: {info['status']:10} | Progress: {progress:5.1f}% | Keyword: {current_keyword}")
         
-        print(f"\n📈 DATABASE STATS:")
+        out(f"\n📈 DATABASE STATS:")
         db_stats = status.get('database_stats', {})
-        print(f"   Total Applications: {db_stats.get('total_applications', 0)}")
+        out(f"   Total Applications: {db_stats.get('total_applications', 0)}")
         for keyword, count in db_stats.get('by_keyword', {}).items():
-            print(f"   {keyword}: {count}")
+            out(f"   {keyword}: {count}")
         
-        print(f"\n🔍 RECENT ACTIVITY (last 10):")
+        out(f"\n🔍 RECENT ACTIVITY (last 10):")
         recent_activity = status.get('live_activity', [])
         for entry in recent_activity[-10:]:
             timestamp = entry['timestamp']
             borough = (entry['borough'] or 'SYSTEM')[:15].ljust(15)
             message = entry['message'][:50]
             level_emoji = {'error': '❌', 'warning': '⚠️', 'info': '✅'}.get(entry['level'], 'ℹ️')
-            print(f"   [{timestamp}] {level_emoji} {borough} | {message}")
+            out(f"   [{timestamp}] {level_emoji} {borough} | {message}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    @staticmethod
+    def status_snapshot(status):
+        """Fields print_status shows, minus timestamps, so unchanged redraws can be skipped"""
+        boroughs = tuple(
+            (borough, info['status'], info.get('progress_percentage', 0), info.get('current_keyword'))
+            for borough, info in status['boroughs'].items()
+        )
+        db_stats = status.get('database_stats', {})
+        recent = tuple(
+            (entry['timestamp'], entry['message']) for entry in status.get('live_activity', [])[-10:]
+        )
+        return (
+            status['active_scrapers'], status['completed_scrapers'], status['error_scrapers'],
+            status['overall_progress'], boroughs,
+            db_stats.get('total_applications', 0), tuple(db_stats.get('by_keyword', {}).items()),
+            recent
+        )
 
     def test_url_access(self):
         """Test basic URL access for all boroughs"""
         print("\n🌐 TESTING URL ACCESS:")
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        
-        for borough, config in BOROUGHS_CONFIG.items():
+        def probe(config):
             try:
-                response = requests.get(config['base_url'], headers=headers, timeout=10)
-                status_emoji = '✅' if response.status_code == 200 else '❌'
-                print(f"   {status_emoji} {borough:20} | {response.status_code} | {config['base_url']}")
+                return self.session.get(config['base_url'], timeout=10).status_code, None
             except Exception as e:
-                print(f"   ❌ {borough:20} | ERROR | {str(e)[:50]}")
+                return None, e
+        
+        def probe_host(members):
+            # Same-host boroughs go through one worker in turn, reusing its kept-alive connection
+            return {borough: probe(config) for borough, config in members}
+        
+        hosts = defaultdict(list)
+        for borough, config in BOROUGHS_CONFIG.items():
+            hosts[urlparse(config['base_url']).netloc].append((borough, config))
+        
+        # One worker per host, so the whole check takes as long as the slowest host;
+        # results still print in config order
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(16, len(hosts))) as executor:
+            for host_results in executor.map(probe_host, hosts.values()):
+                results.update(host_results)
+            
+            for borough, config in BOROUGHS_CONFIG.items():
+                status_code, error = results[borough]
+                if error is not None:
+                    print(f"   ❌ {borough:20} | ERROR | {str(error)[:50]}")
+                else:
+                    status_emoji = '✅' if status_code == 200 else '❌'
+                    print(f"   {status_emoji} {borough:20} | {status_code} | {config['base_url']}")
 
     def run_test_scrape(self, borough_name="Westminster", keyword="extension"):
         """Run a test scrape and show detailed output"""
@@ -104,9 +160,25 @@ class LiveMonitor:
         print("🚀 Starting live monitoring... Press Ctrl+C to stop")
         
         try:
+            last_snapshot = None
+            next_frame = 0.0
             while self.running:
-                self.print_status()
-                time.sleep(5)  # Update every 5 seconds
+                # Redraw when the manager reports a change; the timeout is only a fallback
+                self.manager.state_changed.wait(timeout=5)
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self.manager.state_changed.clear()
+                if not self.running:
+                    break
+                
+                next_frame = time.monotonic() + MIN_REDRAW_INTERVAL
+                status = self.manager.get_scraping_status()
+                snapshot = self.status_snapshot(status)
+                if snapshot == last_snapshot:
+                    continue
+                last_snapshot = snapshot
+                self.print_status(status)
         except KeyboardInterrupt:
             print("\n\n⏹️ Monitoring stopped by user")
             
@@ -149,6 +221,7 @@ def main():
             thread = monitor.start_live_monitor()
             input("\nPress Enter to stop live monitoring...")
             monitor.running = False
+            monitor.manager.state_changed.set()  # wake the loop so it exits promptly
             
         elif choice == "5":
             print("\n🚀 Starting scraping for all boroughs...")
@@ -3,9 +3,14 @@
 Replicate the manual browser success with more specific search criteria
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
+from urllib3.util.request import ACCEPT_ENCODING
+import lxml.html
+from lxml import etree
+from http_client import build_session
+from utils import RateLimiter
+from westminster_client import element_text
+
+RESULTS_TABLE_XPATH = etree.XPath("//table[contains(@class, 'results') or @id='searchresults']")
 
 def test_specific_searches():
     """Test specific searches that should return manageable results"""
@@ -29,12 +34,11 @@ def test_specific_searches():
         "conservatory extension"
     ]
     
-    session = requests.Session()
-    session.headers.update({
+    session = build_session({
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
+        'Accept-Encoding': ACCEPT_ENCODING,
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1',
         'Sec-Fetch-Dest': 'document',
@@ -42,50 +46,56 @@ def test_specific_searches():
         'Sec-Fetch-Site': 'same-origin'
     })
     
+    # Be polite between searches, without waiting again for time already spent on a response
+    rate_limiter = RateLimiter(2)
+    
+    # The form's field names don't change between searches, so load and parse it once
+    try:
+        response = session.get(search_url)
+    except Exception as e:
+        print(f"❌ Exception loading search page: {str(e)[:50]}")
+        return
+        
+    if response.status_code != 200:
+        print(f"❌ Can't access search page: {response.status_code}")
+        return
+        
+    print(f"✅ Search page loaded: {response.status_code}")
+    
+    page = lxml.html.fromstring(response.content)
+    if not page.forms:
+        print("❌ No form found")
+        return
+        
+    # Look for common field names
+    proposal_field = None
+    proposal_fields = ['proposal', 'description', 'caseDescription', 'details']
+    for field_name in proposal_fields:
+        if page.xpath('//input[@name=$name] | //textarea[@name=$name]', name=field_name):
+            proposal_field = field_name
+            print(f"📝 Using field: {field_name}")
+            break
+            
+    if proposal_field is None:
+        print("❌ No proposal field found")
+        return
+    
+    # Add other common form fields
+    hidden_fields = {}
+    for field in page.xpath('//input[@type="hidden"]'):
+        name = field.get('name')
+        value = field.get('value')
+        if name and value:
+            hidden_fields[name] = value
+    
     for search_term in specific_searches:
         print(f"\n🔍 Testing: '{search_term}'")
         print("-" * 50)
         
         try:
-            # Get search page first
-            response = session.get(search_url)
-            if response.status_code != 200:
-                print(f"   ❌ Can't access search page: {response.status_code}")
-                continue
-                
-            print(f"   ✅ Search page loaded: {response.status_code}")
-            
-            # Parse form to get correct field names
-            soup = BeautifulSoup(response.content, 'html.parser')
-            form = soup.find('form')
-            
-            if not form:
-                print("   ❌ No form found")
-                continue
-                
             # Build form data
-            form_data = {}
-            
-            # Look for common field names
-            proposal_fields = ['proposal', 'description', 'caseDescription', 'details']
-            for field_name in proposal_fields:
-                field = soup.find('input', {'name': field_name}) or soup.find('textarea', {'name': field_name})
-                if field:
-                    form_data[field_name] = search_term
-                    print(f"   📝 Using field: {field_name}")
-                    break
-                    
-            if not form_data:
-                print("   ❌ No proposal field found")
-                continue
-            
-            # Add other common form fields
-            hidden_fields = soup.find_all('input', {'type': 'hidden'})
-            for field in hidden_fields:
-                name = field.get('name')
-                value = field.get('value')
-                if name and value:
-                    form_data[name] = value
+            form_data = {proposal_field: search_term}
+            form_data.update(hidden_fields)
             
             # Add submit action
             form_data['submit'] = 'Search'
@@ -93,35 +103,38 @@ def test_specific_searches():
             print(f"   📤 Submitting form with {len(form_data)} fields")
             
             # Submit search
+            rate_limiter.wait()
             search_response = session.post(search_url, data=form_data, timeout=15)
             
             print(f"   📊 Response: {search_response.status_code}")
             
             if search_response.status_code == 200:
-                content = search_response.text.lower()
+                # bytes.lower() is ASCII-only and skips decoding the body to str first
+                body = search_response.content
+                content = body.lower()
                 
-                if "too many results" in content:
+                if b"too many results" in content:
                     print("   ⚠️ Too many results (success but need refinement)")
-                elif "no results" in content or "no applications found" in content:
+                elif b"no results" in content or b"no applications found" in content:
                     print("   📭 No results found")
-                elif "application" in content and "reference" in content:
+                elif b"application" in content and b"reference" in content:
                     print("   🎉 RESULTS FOUND! Parsing...")
                     
-                    # Try to parse results
-                    results_soup = BeautifulSoup(search_response.content, 'html.parser')
-                    tables = results_soup.find_all('table')
+                    # Try to parse results; prefer the results table, else scan every table
+                    results_tree = lxml.html.fromstring(body)
+                    tables = RESULTS_TABLE_XPATH(results_tree) or results_tree.xpath('//table')
                     
                     for table in tables:
-                        rows = table.find_all('tr')
+                        rows = table.xpath('.//tr')
                         if len(rows) > 1:  # Has data rows
                             print(f"      📋 Found table with {len(rows)-1} rows")
                             
                             # Show first few results
                             for i, row in enumerate(rows[1:3], 1):  # First 2 data rows
-                                cells = row.find_all(['td', 'th'])
+                                cells = row.xpath('.//td|.//th')
                                 if len(cells) >= 2:
-                                    ref = cells[0].get_text(strip=True)
-                                    desc = cells[1].get_text(strip=True) if len(cells) > 1 else ""
+                                    ref = element_text(cells[0])
+                                    desc = element_text(cells[1])
                                     print(f"      {i}. {ref}: {desc[:50]}...")
                 else:
                     print("   ❓ Unknown response format")
@@ -133,8 +146,6 @@ def test_specific_searches():
                 
         except Exception as e:
             print(f"   ❌ Exception: {str(e)[:50]}")
-            
-        time.sleep(2)  # Be polite
     
     print("\n\n🎯 SUMMARY")
     print("=" * 40)
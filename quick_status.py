@@ -3,9 +3,16 @@
 Quick status check for all scrapers
 """
 
+import sys
 from scraper_manager import ScrapingManager
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 def main():
     print('🎯 COMPLETE SYSTEM STATUS REPORT')
     print('=' * 80)
@@ -15,7 +22,13 @@ def main():
 
     # Get detailed status
     status = manager.get_scraping_status()
-    print(json.dumps(status, indent=2))
+    if ORJSON_AVAILABLE:
+        # Serialise straight to bytes; flush first so it lands after the header above
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(status, option=orjson.OPT_INDENT_2) + b'\n')
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(status, indent=2))
 
     print('\n🚀 QUICK SCRAPER TEST')
     print('=' * 40)
@@ -24,7 +37,7 @@ def main():
     for borough in ['Westminster']:
         print(f'\n🏛️ Testing {borough}:')
         try:
-            scraper = manager.scrapers[borough]
+            scraper = manager.get_scraper(borough)
             print(f'   ✅ Scraper available: {type(scraper).__name__}')
             print(f'   🌐 Base URL: {scraper.base_url}')
             print(f'   🔍 Search URL: {scraper.search_url}')
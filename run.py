@@ -6,14 +6,23 @@ Handles basic setup and launches the Streamlit application
 
 import os
 import sys
+import time
+import shutil
 import subprocess
 import logging
+import importlib.util
+from importlib import metadata
 from pathlib import Path
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# A passing Chrome/Selenium check is remembered for a day
+CHROME_CHECK_CACHE = Path.home() / '.cache' / 'planning-scraper' / 'chromedriver_ok'
+CHROME_CHECK_TTL = 24 * 3600
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     required_packages = [
@@ -30,9 +39,10 @@ def check_dependencies():
     
     for package in required_packages:
         try:
-            __import__(package)
+            # Look up the installed distribution instead of importing it (pandas alone is ~300ms)
+            metadata.distribution(package)
             logger.info(f"✅ {package} is installed")
-        except ImportError:
+        except metadata.PackageNotFoundError:
             missing_packages.append(package)
             logger.error(f"❌ {package} is missing")
     
@@ -57,16 +67,24 @@ def initialize_database():
 def check_chrome():
     """Check if Chrome/Chromium is available for Selenium"""
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from webdriver_manager.chrome import ChromeDriverManager
+        if CHROME_CHECK_CACHE.exists() and time.time() - CHROME_CHECK_CACHE.stat().st_mtime < CHROME_CHECK_TTL:
+            logger.info("✅ Chrome/Selenium is available (cached)")
+            return True
         
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
+        # Verify presence without downloading a driver or starting a browser
+        if importlib.util.find_spec('selenium') is None:
+            raise RuntimeError("selenium is not installed")
+        # Selenium 4.6+ resolves a driver itself through Selenium Manager, so a
+        # Chrome/Chromium install is enough; older versions need chromedriver on PATH
+        if not shutil.which('chromedriver'):
+            selenium_major_minor = tuple(int(part) for part in metadata.version('selenium').split('.')[:2])
+            if selenium_major_minor < (4, 6):
+                raise RuntimeError("chromedriver not found on PATH")
+            if not any(shutil.which(name) for name in CHROME_BINARIES):
+                raise RuntimeError("Chrome/Chromium not found on PATH")
         
-        driver = webdriver.Chrome(ChromeDriverManager().install(), options=chrome_options)
-        driver.quit()
+        CHROME_CHECK_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        CHROME_CHECK_CACHE.touch()
         logger.info("✅ Chrome/Selenium is available")
         return True
     except Exception as e:
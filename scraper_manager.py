@@ -4,14 +4,18 @@ Coordinates scraping across all London boroughs and manages the overall process
 """
 
 import logging
+import queue
 import threading
 import time
+from dataclasses import dataclass, replace
 from typing import List, Dict, Optional, Callable
 from datetime import datetime
 import concurrent.futures
+from urllib.parse import urlparse
 
 from config import BOROUGHS_CONFIG, MONITORING_KEYWORDS
 from database import PlanningDatabase
+from http_client import build_session
 from scrapers import create_scraper
 from utils import ValidationUtils
 
@@ -19,35 +23,106 @@ from utils import ValidationUtils
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Finished boroughs queue their results for one writer thread, which commits
+# whatever has piled up (up to WRITE_BATCH_ROWS rows) in a single transaction
+WRITE_QUEUE_SIZE = 512
+WRITE_BATCH_ROWS = 1000
+WRITE_TIMEOUT = 300  # seconds a worker waits for its results to be committed
+_WRITER_STOP = object()
+
+# Boroughs run in parallel, but no more than this many at once against one host
+MAX_SCRAPES_PER_HOST = 2
+
+# Minimum seconds between progress callbacks per borough; final phases always go through
+PROGRESS_CALLBACK_INTERVAL = 0.1
+
+# Seconds database statistics are reused between status polls; querying them also
+# flushes the buffered scraping logs, so event-driven pollers mustn't do it every time
+DB_STATS_INTERVAL = 5.0
+
+@dataclass(frozen=True)
+class BoroughStatus:
+    """One borough's scraping state; never mutated, a new one is published on every change"""
+    __slots__ = (
+        'status', 'last_run', 'last_error', 'applications_found', 'current_keyword',
+        'keywords_completed', 'total_keywords', 'start_time', 'start_monotonic',
+        'requests_made', 'pages_processed', 'current_phase'
+    )
+    
+    status: str
+    last_run: Optional[str]
+    last_error: Optional[str]
+    applications_found: int
+    current_keyword: Optional[str]
+    keywords_completed: int
+    total_keywords: int
+    start_time: Optional[str]
+    start_monotonic: Optional[float]
+    requests_made: int
+    pages_processed: int
+    current_phase: str
+    
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+IDLE_STATUS = BoroughStatus(
+    status='initialized', last_run=None, last_error=None, applications_found=0,
+    current_keyword=None, keywords_completed=0, total_keywords=0, start_time=None,
+    start_monotonic=None, requests_made=0, pages_processed=0, current_phase='idle'
+)
+
 class ScrapingManager:
     """Manages the scraping process across all boroughs with ultra-granular real-time status tracking"""
     
     def __init__(self, db_path: str = None, progress_callback: Callable = None):
         self.database = PlanningDatabase(db_path)
-        self.scrapers = {}
+        self.scrapers = {}  # Created on first use by get_scraper
+        self._scraper_locks = {borough_name: threading.Lock() for borough_name in BOROUGHS_CONFIG}
         self.scraping_status = {}
         self.is_running = False
         self.current_progress = {}  # Track current keyword being searched per borough
         self.progress_callback = progress_callback  # Callback for UI updates
+        self._last_callback = {}  # borough -> monotonic time of its last progress callback
         self.live_activity = []  # Store live activity logs
         self.url_tracking = {}  # Track current URLs being accessed
-        
-        # Automatically initialize scrapers on creation
-        self.log_activity("🚀 ScrapingManager created, initializing scrapers...")
-        try:
-            self.initialize_scrapers()
-        except Exception as e:
-            self.log_activity(f"❌ Error during auto-initialization: {str(e)}", level="error")
+        self.http_session = build_session()  # One connection pool shared by every borough's scraper
+        self.state_changed = threading.Event()  # Set whenever status/progress/activity changes
+        
+        # get_scraping_status reuses one enhanced dict per borough and only rebuilds
+        # those whose status changed since the last poll
+        self._status_snapshots = {}
+        self._dirty_boroughs = set()
+        self._dirty_lock = threading.Lock()
+        self._db_stats = None
+        self._db_stats_at = 0.0  # monotonic time _db_stats was queried
+        
+        # Database writes from every borough worker go through one writer thread
+        self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        
+        # Every configured borough shows up in the status straight away; its scraper
+        # is only built when that borough is first scraped
+        for borough_name in BOROUGHS_CONFIG:
+            self.scraping_status[borough_name] = IDLE_STATUS
+            self.current_progress[borough_name] = {
+                'current_keyword': None,
+                'keyword_index': 0,
+                'total_keywords': 0
+            }
+            self._dirty_boroughs.add(borough_name)
+        self.log_activity(f"🚀 ScrapingManager created for {len(BOROUGHS_CONFIG)} boroughs, scrapers load on first use")
         
     def log_activity(self, message: str, borough: str = None, level: str = "info"):
         """Log activity with timestamp for real-time display"""
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]  # Include milliseconds
+        now = datetime.now()
+        timestamp = now.strftime('%H:%M:%S.%f')[:-3]  # Include milliseconds
         log_entry = {
             'timestamp': timestamp,
             'message': message,
             'borough': borough,
             'level': level,
-            'full_timestamp': datetime.now().isoformat()
+            'full_timestamp': now.isoformat()
         }
         
         self.live_activity.append(log_entry)
@@ -56,6 +131,8 @@ class ScrapingManager:
         if len(self.live_activity) > 100:
             self.live_activity = self.live_activity[-100:]
         
+        self.state_changed.set()
+        
         # Also log to standard logger
         if level == "error":
             logger.error(f"[{borough or 'SYSTEM'}] {message}")
@@ -64,6 +141,84 @@ class ScrapingManager:
         else:
             logger.info(f"[{borough or 'SYSTEM'}] {message}")
     
+    def _writer_loop(self):
+        """Drain queued borough results and commit them in batches"""
+        while True:
+            item = self._write_queue.get()
+            if item is _WRITER_STOP:
+                return
+            
+            # Take whatever else is already waiting, so concurrent boroughs share a commit
+            batch = [item]
+            rows = len(item[1])
+            stop = False
+            while rows < WRITE_BATCH_ROWS:
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _WRITER_STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                rows += len(item[1])
+            
+            self._write_batch(batch)
+            if stop:
+                return
+    
+    def _write_batch(self, batch):
+        """Insert each borough's applications and log row in one transaction"""
+        try:
+            counts = []
+            with self.database.transaction():
+                for borough_name, applications, _ in batch:
+                    total_count, new_count = self.database.bulk_insert_applications(applications)
+                    self.database.log_scraping_session(
+                        borough=borough_name,
+                        records_found=total_count,
+                        records_new=new_count,
+                        status='success'
+                    )
+                    counts.append((total_count, new_count))
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} borough results: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(batch, counts):
+            future.set_result(result)
+    
+    def save_applications(self, borough_name: str, applications: List[Dict]):
+        """Hand a borough's applications to the writer thread; returns (total, new) once committed"""
+        future = concurrent.futures.Future()
+        item = (borough_name, applications, future)
+        
+        if not self._writer_thread.is_alive():
+            # After cleanup (or if the writer died) nothing drains the queue, so write here
+            logger.warning(f"Writer thread not running, saving {borough_name} results directly")
+            self._write_batch([item])
+            return future.result()
+        
+        try:
+            self._write_queue.put(item, timeout=WRITE_TIMEOUT)
+            return future.result(timeout=WRITE_TIMEOUT)
+        except (queue.Full, concurrent.futures.TimeoutError):
+            raise RuntimeError(f"Timed out after {WRITE_TIMEOUT}s waiting for the database writer") from None
+    
+    def _publish_status(self, borough_name: str, **changes):
+        """Replace a borough's status with an updated copy in one dict store, so
+        pollers see either the old state or the new one, never a mix"""
+        self.scraping_status[borough_name] = replace(self.scraping_status[borough_name], **changes)
+        self._touch(borough_name)
+    
+    def _touch(self, borough_name: str):
+        """Mark a borough's status as changed for the next get_scraping_status"""
+        with self._dirty_lock:
+            self._dirty_boroughs.add(borough_name)
+        self.state_changed.set()
+    
     def update_url_tracking(self, borough_name: str, current_url: str = None, action: str = None):
         """Track current URL being accessed for real-time display"""
         if borough_name not in self.url_tracking:
@@ -74,68 +229,51 @@ class ScrapingManager:
             'action': action,
             'last_updated': datetime.now().isoformat()
         })
+        self._touch(borough_name)
         
         # Log the activity
         if current_url and action:
             self.log_activity(f"{action}: {current_url}", borough_name)
     
-    def initialize_scrapers(self):
-        """Initialize scrapers for all configured boroughs"""
-        self.log_activity("🔧 Initializing scrapers for all boroughs...")
-        self.log_activity(f"📋 Found {len(BOROUGHS_CONFIG)} boroughs in config: {list(BOROUGHS_CONFIG.keys())}")
-        
-        for borough_name in BOROUGHS_CONFIG.keys():
+    def get_scraper(self, borough_name: str):
+        """Return the borough's scraper, creating it on first use; None if it can't be created"""
+        scraper = self.scrapers.get(borough_name)
+        if scraper is not None or borough_name not in self._scraper_locks:
+            return scraper
+        
+        # Each borough has its own lock, so different boroughs build their scrapers in parallel
+        with self._scraper_locks[borough_name]:
+            scraper = self.scrapers.get(borough_name)
+            if scraper is not None:
+                return scraper
+            
             try:
                 self.log_activity(f"Creating scraper instance...", borough_name)
-                self.log_activity(f"📞 Calling create_scraper with borough_name='{borough_name}'", borough_name)
                 
                 # Pass the log_activity method as the activity logger
-                scraper = create_scraper(borough_name, activity_logger=self.log_activity)
+                scraper = create_scraper(borough_name, activity_logger=self.log_activity, session=self.http_session)
                 
                 if scraper is None:
                     raise Exception("create_scraper returned None")
                 
                 self.scrapers[borough_name] = scraper
-                self.log_activity(f"✅ Scraper created and stored: {type(scraper).__name__}", borough_name)
-                
-                self.scraping_status[borough_name] = {
-                    'status': 'initialized',
-                    'last_run': None,
-                    'last_error': None,
-                    'applications_found': 0,
-                    'current_keyword': None,
-                    'keywords_completed': 0,
-                    'total_keywords': 0,
-                    'start_time': None,
-                    'requests_made': 0,
-                    'pages_processed': 0,
-                    'current_phase': 'idle'
-                }
-                self.current_progress[borough_name] = {
-                    'current_keyword': None,
-                    'keyword_index': 0,
-                    'total_keywords': 0
-                }
-                
-                self.log_activity(f"✅ Scraper initialized successfully", borough_name)
+                self.log_activity(f"✅ Scraper initialized successfully: {type(scraper).__name__}", borough_name)
                 
             except Exception as e:
                 self.log_activity(f"❌ Failed to initialize scraper: {str(e)}", borough_name, "error")
                 self.log_activity(f"🔍 Exception type: {type(e).__name__}", borough_name, "error")
                 
-                self.scraping_status[borough_name] = {
-                    'status': 'error',
-                    'last_run': None,
-                    'last_error': str(e),
-                    'applications_found': 0,
-                    'current_keyword': None,
-                    'keywords_completed': 0,
-                    'total_keywords': 0,
-                    'start_time': None,
-                    'requests_made': 0,
-                    'pages_processed': 0,
-                    'current_phase': 'error'
-                }
+                self._publish_status(borough_name, status='error', last_error=str(e), current_phase='error')
+        
+        return scraper
+    
+    def initialize_scrapers(self):
+        """Create scrapers for all configured boroughs up front (normally they load on first use)"""
+        self.log_activity("🔧 Initializing scrapers for all boroughs...")
+        self.log_activity(f"📋 Found {len(BOROUGHS_CONFIG)} boroughs in config: {list(BOROUGHS_CONFIG.keys())}")
+        
+        for borough_name in BOROUGHS_CONFIG.keys():
+            self.get_scraper(borough_name)
         
         self.log_activity(f"🎯 Scraper initialization complete. {len(self.scrapers)} scrapers available: {list(self.scrapers.keys())}")
         if len(self.scrapers) == 0:
@@ -144,11 +282,11 @@ class ScrapingManager:
     def update_progress(self, borough_name: str, keyword: str = None, keyword_index: int = 0, total_keywords: int = 0, phase: str = None):
         """Update progress tracking for real-time display"""
         if borough_name in self.current_progress:
-            self.current_progress[borough_name].update({
+            self.current_progress[borough_name] = {
                 'current_keyword': keyword,
                 'keyword_index': keyword_index,
                 'total_keywords': total_keywords
-            })
+            }
             
             # Also update scraping status
             if borough_name in self.scraping_status:
@@ -160,47 +298,57 @@ class ScrapingManager:
                 if phase:
                     updates['current_phase'] = phase
                 
-                self.scraping_status[borough_name].update(updates)
+                self._publish_status(borough_name, **updates)
+            else:
+                self._touch(borough_name)
             
             # Log progress update
             if keyword:
                 progress_pct = (keyword_index / total_keywords * 100) if total_keywords > 0 else 0
                 self.log_activity(f"📊 Progress: {keyword_index}/{total_keywords} ({progress_pct:.1f}%) - {keyword}", borough_name)
             
-            # Call progress callback if provided (for UI updates)
-            if self.progress_callback:
-                try:
-                    self.progress_callback(borough_name, keyword, keyword_index, total_keywords)
-                except Exception as e:
-                    logger.error(f"Error in progress callback: {e}")
+            # Call progress callback if provided (for UI updates), at most every
+            # PROGRESS_CALLBACK_INTERVAL per borough
+            callback = self.progress_callback
+            if callback is not None:
+                now = time.monotonic()
+                if phase in ('completed', 'error') or now - self._last_callback.get(borough_name, 0.0) >= PROGRESS_CALLBACK_INTERVAL:
+                    self._last_callback[borough_name] = now
+                    try:
+                        callback(borough_name, keyword, keyword_index, total_keywords)
+                    except Exception as e:
+                        logger.error(f"Error in progress callback: {e}")
     
     def scrape_single_borough(self, borough_name: str, keywords: List[str] = None) -> Dict:
         """Scrape a single borough with ultra-detailed progress tracking"""
-        if borough_name not in self.scrapers:
+        scraper = self.get_scraper(borough_name)
+        if scraper is None:
             error_msg = f"No scraper available for {borough_name}"
             self.log_activity(error_msg, borough_name, "error")
-            return {'success': False, 'error': error_msg}
+            return {'success': False, 'borough': borough_name, 'error': error_msg}
         
         if keywords is None:
             keywords = MONITORING_KEYWORDS
-            
-        scraper = self.scrapers[borough_name]
+        
         start_time = datetime.now()
+        start_monotonic = time.monotonic()
         
         self.log_activity(f"🚀 Starting scraping session with {len(keywords)} keywords", borough_name)
         
         try:
             # Update status to running
-            self.scraping_status[borough_name].update({
-                'status': 'running',
-                'start_time': start_time.isoformat(),
-                'total_keywords': len(keywords),
-                'keywords_completed': 0,
-                'current_keyword': None,
-                'requests_made': 0,
-                'pages_processed': 0,
-                'current_phase': 'starting'
-            })
+            self._publish_status(
+                borough_name,
+                status='running',
+                start_time=start_time.isoformat(),
+                start_monotonic=start_monotonic,
+                total_keywords=len(keywords),
+                keywords_completed=0,
+                current_keyword=None,
+                requests_made=0,
+                pages_processed=0,
+                current_phase='starting'
+            )
             
             # Get base configuration for URL tracking
             config = BOROUGHS_CONFIG[borough_name]
@@ -210,61 +358,60 @@ class ScrapingManager:
             self.log_activity(f"🌐 Target portal: {base_url}", borough_name)
             self.log_activity(f"🔍 Search endpoint: {search_url}", borough_name)
             
-            self.update_progress(borough_name, None, 0, len(keywords), "initializing")
+            # Perform scraping with progress tracking; results are deduplicated on
+            # project_id as they arrive, so repeats across keywords are never kept
+            final_applications = []
+            seen_ids = set()
+            found_count = 0
             
-            # Perform scraping with progress tracking
-            all_applications = []
+            if not hasattr(scraper, 'search_keywords'):
+                self.log_activity(f"⚠️ Scraper does not support keyword search", borough_name, "warning")
+                keyword_results = iter(())
+            else:
+                # The scraper runs the keyword searches itself, overlapping their requests;
+                # results come back in keyword order as each one finishes
+                self.log_activity(f"🕷️ Executing {len(keywords)} keyword searches...", borough_name)
+                self.update_progress(borough_name, None, 0, len(keywords), "searching")
+                self.update_url_tracking(borough_name, search_url, f"Searching for {len(keywords)} keywords")
+                keyword_results = scraper.search_keywords(keywords)
             
-            for i, keyword in enumerate(keywords):
+            for i, (keyword, keyword_apps, error) in enumerate(keyword_results):
                 if not self.is_running and len(keywords) > 1:  # Allow stopping mid-process
                     self.log_activity(f"⏹️ Stop signal received, terminating scraping", borough_name, "warning")
+                    keyword_results.close()  # cancels the searches not yet started
                     break
-                    
-                self.log_activity(f"🔍 Starting search for keyword: '{keyword}' ({i+1}/{len(keywords)})", borough_name)
-                self.update_progress(borough_name, keyword, i, len(keywords), "searching")
-                
-                # Update URL tracking for the search
-                self.update_url_tracking(borough_name, search_url, f"Searching for '{keyword}'")
                 
                 try:
-                    # Get applications for this keyword with detailed tracking
-                    self.log_activity(f"📝 Preparing search form data for '{keyword}'", borough_name)
+                    if error is not None:
+                        raise error
                     
-                    # Track the actual scraping call
-                    if hasattr(scraper, 'search_keyword'):
-                        self.log_activity(f"🕷️ Executing search request...", borough_name)
-                        
-                        # The scraper will now log its own detailed activity
-                        keyword_apps = scraper.search_keyword(keyword)
-                        
-                        # Update request counter (scrapers will report their own requests)
-                        if borough_name in self.scraping_status:
-                            self.scraping_status[borough_name]['requests_made'] += 1
-                        
-                        self.log_activity(f"✅ Search completed. Found {len(keyword_apps)} applications for '{keyword}'", borough_name)
+                    # Update request counter (scrapers will report their own requests)
+                    if borough_name in self.scraping_status:
+                        status = self.scraping_status[borough_name]
+                        self._publish_status(borough_name, requests_made=status.requests_made + 1)
+                    
+                    self.log_activity(f"✅ Search completed. Found {len(keyword_apps)} applications for '{keyword}'", borough_name)
+                    
+                    # Update URL tracking for each application processed
+                    for idx, app in enumerate(keyword_apps):
+                        app_id = app.get('project_id', f'app_{idx}')
+                        app_url = app.get('application_url', '')
                         
-                        # Update URL tracking for each application processed
-                        for idx, app in enumerate(keyword_apps):
-                            app_id = app.get('project_id', f'app_{idx}')
-                            app_url = app.get('application_url', '')
+                        if app_url:
+                            self.update_url_tracking(borough_name, app_url, f"Processed {app_id}")
                             
-                            if app_url:
-                                self.update_url_tracking(borough_name, app_url, f"Processed {app_id}")
-                                
-                                # Brief pause to show URL tracking
-                                time.sleep(0.2)
-                                
-                                if borough_name in self.scraping_status:
-                                    self.scraping_status[borough_name]['pages_processed'] += 1
-                        
-                        all_applications.extend(keyword_apps)
-                        
-                    else:
-                        self.log_activity(f"⚠️ Scraper does not support keyword search", borough_name, "warning")
+                            if borough_name in self.scraping_status:
+                                status = self.scraping_status[borough_name]
+                                self._publish_status(borough_name, pages_processed=status.pages_processed + 1)
                     
-                    # Small delay between keywords to be polite
-                    self.log_activity(f"😴 Waiting 1 second before next keyword (rate limiting)", borough_name)
-                    time.sleep(1)
+                    found_count += len(keyword_apps)
+                    for app in keyword_apps:
+                        project_id = app.get('project_id')
+                        if project_id and project_id not in seen_ids:
+                            seen_ids.add(project_id)
+                            final_applications.append(app)
+                        else:
+                            self.log_activity(f"🔄 Duplicate found: {project_id}", borough_name)
                     
                 except Exception as e:
                     error_msg = f"❌ Error searching for '{keyword}': {str(e)}"
@@ -275,53 +422,36 @@ class ScrapingManager:
                     self.update_progress(borough_name, keyword, i + 1, len(keywords), "processing")
             
             # Process results
-            self.log_activity(f"🔄 Processing {len(all_applications)} total applications", borough_name)
-            self.update_progress(borough_name, None, len(keywords), len(keywords), "deduplicating")
-            
-            # Remove duplicates based on project_id
-            unique_applications = {}
-            for app in all_applications:
-                project_id = app.get('project_id')
-                if project_id and project_id not in unique_applications:
-                    unique_applications[project_id] = app
-                else:
-                    self.log_activity(f"🔄 Duplicate found: {project_id}", borough_name)
-            
-            final_applications = list(unique_applications.values())
+            self.log_activity(f"🔄 Processing {found_count} total applications", borough_name)
             self.log_activity(f"✨ Deduplicated to {len(final_applications)} unique applications", borough_name)
             
             # Store results in database
             self.log_activity(f"💾 Saving results to database...", borough_name)
             self.update_progress(borough_name, None, len(keywords), len(keywords), "saving")
             
-            total_count, new_count = self.database.bulk_insert_applications(final_applications)
+            # The applications and this run's log row commit together, batched with
+            # any other boroughs that finish at the same time
+            total_count, new_count = self.save_applications(borough_name, final_applications)
             
             self.log_activity(f"✅ Database updated: {new_count} new out of {total_count} total", borough_name)
             
             # Update status to completed
-            self.scraping_status[borough_name].update({
-                'status': 'completed',
-                'last_run': start_time.isoformat(),
-                'last_error': None,
-                'applications_found': len(final_applications),
-                'current_keyword': None,
-                'keywords_completed': len(keywords),
-                'current_phase': 'completed'
-            })
+            self._publish_status(
+                borough_name,
+                status='completed',
+                last_run=start_time.isoformat(),
+                last_error=None,
+                applications_found=len(final_applications),
+                current_keyword=None,
+                keywords_completed=len(keywords),
+                current_phase='completed'
+            )
             
             # Clear progress and URL tracking
             self.update_progress(borough_name, None, len(keywords), len(keywords), "completed")
             self.update_url_tracking(borough_name, None, "Completed")
             
-            # Log scraping session
-            self.database.log_scraping_session(
-                borough=borough_name,
-                records_found=total_count,
-                records_new=new_count,
-                status='success'
-            )
-            
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.monotonic() - start_monotonic
             self.log_activity(f"🎉 Scraping completed successfully in {duration:.1f} seconds", borough_name)
             
             return {
@@ -331,8 +461,8 @@ class ScrapingManager:
                 'new_applications': new_count,
                 'keywords_searched': len(keywords),
                 'duration': duration,
-                'requests_made': self.scraping_status[borough_name].get('requests_made', 0),
-                'pages_processed': self.scraping_status[borough_name].get('pages_processed', 0)
+                'requests_made': self.scraping_status[borough_name].requests_made,
+                'pages_processed': self.scraping_status[borough_name].pages_processed
             }
             
         except Exception as e:
@@ -340,14 +470,15 @@ class ScrapingManager:
             self.log_activity(error_msg, borough_name, "error")
             
             # Update status with error
-            self.scraping_status[borough_name].update({
-                'status': 'error',
-                'last_run': start_time.isoformat(),
-                'last_error': str(e),
-                'applications_found': 0,
-                'current_keyword': None,
-                'current_phase': 'error'
-            })
+            self._publish_status(
+                borough_name,
+                status='error',
+                last_run=start_time.isoformat(),
+                last_error=str(e),
+                applications_found=0,
+                current_keyword=None,
+                current_phase='error'
+            )
             
             # Clear progress and URL tracking
             self.update_progress(borough_name, None, 0, len(keywords) if keywords else 0, "error")
@@ -366,7 +497,7 @@ class ScrapingManager:
                 'success': False,
                 'borough': borough_name,
                 'error': str(e),
-                'duration': (datetime.now() - start_time).total_seconds()
+                'duration': time.monotonic() - start_monotonic
             }
         
         finally:
@@ -374,30 +505,37 @@ class ScrapingManager:
             if hasattr(scraper, 'close'):
                 scraper.close()
     
-    def scrape_all_boroughs(self, keywords: List[str] = None, max_workers: int = 3) -> List[Dict]:
+    def scrape_all_boroughs(self, keywords: List[str] = None, max_workers: int = None) -> List[Dict]:
         """Scrape all boroughs using threading for efficiency"""
-        # Ensure scrapers are initialized
-        if not self.scrapers:
-            self.log_activity("⚠️ No scrapers found, reinitializing...", level="warning")
-            self.initialize_scrapers()
-        
-        # Double-check that we have scrapers after initialization
-        if not self.scrapers:
-            self.log_activity("❌ Failed to initialize scrapers, cannot proceed", level="error")
-            return []
-        
         self.is_running = True
         results = []
         
-        self.log_activity(f"🚀 Starting scraping for all {len(self.scrapers)} boroughs...")
+        self.log_activity(f"🚀 Starting scraping for all {len(BOROUGHS_CONFIG)} boroughs...")
+        
+        # Every borough gets a worker, which also creates that borough's scraper; the
+        # real limit is per host, so boroughs whose portals share a host take turns
+        # through that host's semaphore
+        if max_workers is None:
+            max_workers = len(BOROUGHS_CONFIG)
+        
+        borough_hosts = {
+            borough: urlparse(config['base_url']).netloc
+            for borough, config in BOROUGHS_CONFIG.items()
+        }
+        host_slots = {
+            host: threading.BoundedSemaphore(MAX_SCRAPES_PER_HOST)
+            for host in set(borough_hosts.values())
+        }
+        
+        def scrape_within_host_limit(borough):
+            with host_slots[borough_hosts[borough]]:
+                return self.scrape_single_borough(borough, keywords)
         
-        # Use ThreadPoolExecutor to scrape multiple boroughs concurrently
-        # but limit concurrent workers to avoid overwhelming servers
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit scraping tasks
             future_to_borough = {
-                executor.submit(self.scrape_single_borough, borough, keywords): borough
-                for borough in self.scrapers.keys()
+                executor.submit(scrape_within_host_limit, borough): borough
+                for borough in BOROUGHS_CONFIG.keys()
             }
             
             # Collect results as they complete
@@ -431,13 +569,10 @@ class ScrapingManager:
     
     def scrape_specific_boroughs(self, borough_names: List[str], keywords: List[str] = None) -> List[Dict]:
         """Scrape specific boroughs"""
-        if not self.scrapers:
-            self.initialize_scrapers()
-        
         results = []
         
         for borough_name in borough_names:
-            if borough_name in self.scrapers:
+            if borough_name in BOROUGHS_CONFIG:
                 result = self.scrape_single_borough(borough_name, keywords)
                 results.append(result)
             else:
@@ -452,99 +587,106 @@ class ScrapingManager:
     
     def get_scraping_status(self) -> Dict:
         """Get current status of all scrapers with detailed progress information and live activity"""
-        # Get database statistics
-        db_stats = self.database.get_statistics()
-        
-        # Calculate overall progress if scraping is running
-        overall_progress = 0
-        if self.is_running and self.scraping_status:
-            total_boroughs = len(self.scraping_status)
-            completed_boroughs = len([
-                status for status in self.scraping_status.values() 
-                if status.get('status') in ['completed', 'error']
-            ])
-            overall_progress = (completed_boroughs / total_boroughs) * 100 if total_boroughs > 0 else 0
-        
-        # Enhanced borough status with progress details
+        # Get database statistics, at most every DB_STATS_INTERVAL seconds
+        now = time.monotonic()
+        if self._db_stats is None or now - self._db_stats_at >= DB_STATS_INTERVAL:
+            self._db_stats = self.database.get_statistics()
+            self._db_stats_at = now
+        db_stats = self._db_stats
+        
+        # Enhanced borough status with progress details; each borough's dict is kept
+        # between polls and only rebuilt when its status changed
+        with self._dirty_lock:
+            dirty, self._dirty_boroughs = self._dirty_boroughs, set()
+        # The same pass also accumulates the summary counters
         enhanced_borough_status = {}
+        active = completed = errors = 0
+        total_requests = total_pages = 0
+        current_keywords = set()
+        # Each status is a frozen BoroughStatus, so one read gives a consistent view
         for borough_name, status in self.scraping_status.items():
-            enhanced_status = status.copy()
+            state = status.status
+            if state == 'running':
+                active += 1
+            elif state == 'completed':
+                completed += 1
+            elif state == 'error':
+                errors += 1
             
-            # Add progress percentage for individual borough
-            if status.get('total_keywords', 0) > 0:
-                keyword_progress = (status.get('keywords_completed', 0) / status['total_keywords']) * 100
-                enhanced_status['progress_percentage'] = round(keyword_progress, 1)
-            else:
-                enhanced_status['progress_percentage'] = 0
+            keyword = status.current_keyword
+            if keyword:
+                current_keywords.add(keyword)
+            total_requests += status.requests_made
+            total_pages += status.pages_processed
             
-            # Add time elapsed if currently running
-            if status.get('status') == 'running' and status.get('start_time'):
-                try:
-                    start_time = datetime.fromisoformat(status['start_time'])
-                    elapsed_seconds = (datetime.now() - start_time).total_seconds()
-                    enhanced_status['elapsed_time'] = round(elapsed_seconds, 1)
-                    enhanced_status['elapsed_formatted'] = f"{int(elapsed_seconds // 60):02d}:{int(elapsed_seconds % 60):02d}"
-                except:
-                    enhanced_status['elapsed_time'] = 0
-                    enhanced_status['elapsed_formatted'] = "00:00"
+            enhanced_status = self._status_snapshots.get(borough_name)
+            if enhanced_status is None:
+                enhanced_status = self._status_snapshots[borough_name] = {}
+                dirty.add(borough_name)
             
-            # Add current progress info
-            if borough_name in self.current_progress:
-                enhanced_status.update(self.current_progress[borough_name])
+            if borough_name in dirty:
+                enhanced_status.clear()
+                enhanced_status.update(status.as_dict())
+                
+                # Add progress percentage for individual borough
+                if status.total_keywords > 0:
+                    keyword_progress = (status.keywords_completed / status.total_keywords) * 100
+                    enhanced_status['progress_percentage'] = round(keyword_progress, 1)
+                else:
+                    enhanced_status['progress_percentage'] = 0
+                
+                # Add current progress info
+                if borough_name in self.current_progress:
+                    enhanced_status.update(self.current_progress[borough_name])
+                
+                # Add URL tracking info
+                if borough_name in self.url_tracking:
+                    enhanced_status['url_info'] = self.url_tracking[borough_name]
             
-            # Add URL tracking info
-            if borough_name in self.url_tracking:
-                enhanced_status['url_info'] = self.url_tracking[borough_name]
+            # Add time elapsed if currently running (changes every poll)
+            start_monotonic = status.start_monotonic
+            if state == 'running' and start_monotonic is not None:
+                elapsed_seconds = now - start_monotonic
+                minutes, seconds = divmod(int(elapsed_seconds), 60)
+                enhanced_status['elapsed_time'] = round(elapsed_seconds, 1)
+                enhanced_status['elapsed_formatted'] = f"{minutes:02d}:{seconds:02d}"
             
             enhanced_borough_status[borough_name] = enhanced_status
         
+        # Calculate overall progress if scraping is running
+        overall_progress = 0
+        if self.is_running and self.scraping_status:
+            overall_progress = (completed + errors) / len(self.scraping_status) * 100
+        
         # Get recent live activity (last 20 entries for UI)
         recent_activity = self.live_activity[-20:] if self.live_activity else []
         
         return {
             'is_running': self.is_running,
             'boroughs': enhanced_borough_status,
-            'total_boroughs': len(self.scrapers),
+            'total_boroughs': len(self.scraping_status),
             'overall_progress': round(overall_progress, 1),
             'database_stats': db_stats,
-            'active_scrapers': len([
-                status for status in self.scraping_status.values() 
-                if status.get('status') == 'running'
-            ]),
-            'completed_scrapers': len([
-                status for status in self.scraping_status.values() 
-                if status.get('status') == 'completed'
-            ]),
-            'error_scrapers': len([
-                status for status in self.scraping_status.values() 
-                if status.get('status') == 'error'
-            ]),
-            'current_keywords': list(set([
-                status.get('current_keyword') 
-                for status in self.scraping_status.values() 
-                if status.get('current_keyword')
-            ])),
+            'active_scrapers': active,
+            'completed_scrapers': completed,
+            'error_scrapers': errors,
+            'current_keywords': list(current_keywords),
             'live_activity': recent_activity,
             'url_tracking': self.url_tracking,
-            'total_requests_made': sum(
-                status.get('requests_made', 0) 
-                for status in self.scraping_status.values()
-            ),
-            'total_pages_processed': sum(
-                status.get('pages_processed', 0) 
-                for status in self.scraping_status.values()
-            ),
+            'total_requests_made': total_requests,
+            'total_pages_processed': total_pages,
             'last_updated': datetime.now().isoformat()
         }
     
     def stop_scraping(self):
         """Stop the scraping process"""
         self.is_running = False
+        self.state_changed.set()
         logger.info("Scraping stop requested")
     
     def cleanup(self):
         """Clean up resources"""
-        for scraper in self.scrapers.values():
+        for scraper in list(self.scrapers.values()):
             if hasattr(scraper, 'close'):
                 try:
                     scraper.close()
@@ -552,6 +694,12 @@ class ScrapingManager:
                     logger.error(f"Error closing scraper: {e}")
         
         self.scrapers.clear()
+        self.http_session.close()
+        
+        # Let the writer finish anything still queued before closing the database
+        self._write_queue.put(_WRITER_STOP)
+        self._writer_thread.join()
+        self.database.close()
         logger.info("Scrapers cleaned up")
 
 class ScheduledScraper:
@@ -606,7 +754,6 @@ def scrape_borough(borough_name: str, keywords: List[str] = None) -> Dict:
     """Convenience function to scrape a single borough"""
     manager = ScrapingManager()
     try:
-        manager.initialize_scrapers()
         return manager.scrape_single_borough(borough_name, keywords)
     finally:
         manager.cleanup()
@@ -5,6 +5,7 @@ Contains scraper classes for each borough's planning application portal
 
 import logging
 import time
+import concurrent.futures
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlparse
 from datetime import datetime, timedelta
@@ -23,11 +24,17 @@ try:
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.common.exceptions import TimeoutException, NoSuchElementException
-    from webdriver_manager.chrome import ChromeDriverManager
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
 
+# Try to import webdriver-manager - only needed when Selenium Manager can't resolve a driver
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+    WEBDRIVER_MANAGER_AVAILABLE = True
+except ImportError:
+    WEBDRIVER_MANAGER_AVAILABLE = False
+
 from config import BOROUGHS_CONFIG, MONITORING_KEYWORDS, SCRAPING_CONFIG
 from utils import ScrapingUtils, TextProcessor, ValidationUtils
 
@@ -38,10 +45,14 @@ logger = logging.getLogger(__name__)
 class BaseScraper:
     """Base class for borough scrapers with live monitoring support"""
     
-    def __init__(self, borough_name: str, activity_logger=None):
+    # Keyword searches in flight at once; ScrapingUtils still spaces the requests
+    # themselves, this only lets a slow response overlap the next search
+    keyword_workers = 2
+    
+    def __init__(self, borough_name: str, activity_logger=None, session=None):
         self.borough_name = borough_name
         self.config = BOROUGHS_CONFIG[borough_name]
-        self.scraping_utils = ScrapingUtils()
+        self.scraping_utils = ScrapingUtils(session)
         self.applications = []
         self.activity_logger = activity_logger  # For live activity logging
     
@@ -69,6 +80,25 @@ class BaseScraper:
         """Search for applications containing a specific keyword - MUST be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement search_keyword")
     
+    def search_keywords(self, keywords: List[str]):
+        """Search several keywords concurrently; yields (keyword, applications, error) in keyword order"""
+        def search(keyword):
+            try:
+                return keyword, self.search_keyword(keyword), None
+            except Exception as e:
+                return keyword, [], e
+        
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.keyword_workers)
+        futures = [executor.submit(search, keyword) for keyword in keywords]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # A caller that stops early cancels the searches not yet started
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
     def parse_application_details(self, application_element) -> Optional[Dict]:
         """Parse application details from HTML element"""
         raise NotImplementedError("Subclasses must implement parse_application_details")
@@ -76,8 +106,8 @@ class BaseScraper:
 class IdoxScraper(BaseScraper):
     """Scraper for Idox-based planning portals (Camden, Westminster, H&F, Tower Hamlets)"""
     
-    def __init__(self, borough_name: str, activity_logger=None):
-        super().__init__(borough_name, activity_logger)
+    def __init__(self, borough_name: str, activity_logger=None, session=None):
+        super().__init__(borough_name, activity_logger, session)
         self.base_url = self.config['base_url']
         self.search_url = self.config['search_url']
         self.log_activity(f"🏗️ Initialized Idox scraper for {borough_name}")
@@ -289,8 +319,8 @@ class IdoxScraper(BaseScraper):
 class SouthwarkScraper(BaseScraper):
     """Scraper for Southwark planning portal (may have different structure)"""
     
-    def __init__(self, borough_name: str = "Southwark", activity_logger=None):
-        super().__init__(borough_name, activity_logger)
+    def __init__(self, borough_name: str = "Southwark", activity_logger=None, session=None):
+        super().__init__(borough_name, activity_logger, session)
         self.base_url = self.config['base_url']
         self.search_url = self.config['search_url']
         self.log_activity(f"🏗️ Initialized Southwark scraper")
@@ -440,6 +470,8 @@ class SouthwarkScraper(BaseScraper):
 class SeleniumScraper(BaseScraper):
     """Selenium-based scraper for JavaScript-heavy portals"""
     
+    keyword_workers = 1  # one WebDriver, one search at a time
+    
     def __init__(self, borough_name: str, activity_logger=None):
         super().__init__(borough_name, activity_logger)
         self.driver = None
@@ -486,14 +518,17 @@ class SeleniumScraper(BaseScraper):
                     break
             
             try:
-                # Try using ChromeDriverManager first
+                # Selenium Manager (Selenium 4.6+) finds or downloads a matching driver
+                # and caches it, so there's no version-check request on every start
+                self.driver = webdriver.Chrome(options=chrome_options)
+            except Exception:
+                if not WEBDRIVER_MANAGER_AVAILABLE:
+                    raise
+                # Fallback to webdriver-manager for older Selenium installs
                 self.driver = webdriver.Chrome(
                     service=Service(ChromeDriverManager().install()),
                     options=chrome_options
                 )
-            except Exception:
-                # Fallback to system chromedriver
-                self.driver = webdriver.Chrome(options=chrome_options)
                 
             self.driver.set_page_load_timeout(SCRAPING_CONFIG['timeout'])
             logger.info(f"Selenium driver setup complete for {self.borough_name}")
@@ -640,7 +675,7 @@ class SeleniumScraper(BaseScraper):
             title = TextProcessor.clean_text(cells[2].text) if len(cells) > 2 else ""
             
             # Basic keyword detection (full details would require additional requests)
-            full_text = f"{title} {address}".lower()
+            full_text = f"{title} {address}"
             detected_keywords = TextProcessor.detect_keywords(full_text)
             
             if not detected_keywords:
@@ -669,12 +704,12 @@ class SeleniumScraper(BaseScraper):
             self.driver.quit()
             logger.info(f"Selenium driver closed for {self.borough_name}")
 
-def create_scraper(borough_name: str, activity_logger=None) -> BaseScraper:
+def create_scraper(borough_name: str, activity_logger=None, session=None) -> BaseScraper:
     """Factory function to create appropriate scraper for each borough with activity logging"""
     if borough_name in ["Camden", "Westminster", "Hammersmith & Fulham", "Tower Hamlets"]:
-        return IdoxScraper(borough_name, activity_logger)
+        return IdoxScraper(borough_name, activity_logger, session)
     elif borough_name == "Southwark":
-        return SouthwarkScraper(borough_name, activity_logger)
+        return SouthwarkScraper(borough_name, activity_logger, session)
     else:
         # Fallback to Selenium scraper for unknown portals
         return SeleniumScraper(borough_name, activity_logger) 
\ No newline at end of file
@@ -23,7 +23,8 @@ except ImportError:
     SELENIUM_AVAILABLE = False
     print("⚠️ Selenium not available. Install with: pip install selenium")
 
-from config import BOROUGHS_CONFIG, MONITORING_KEYWORDS
+from config import BOROUGHS_CONFIG
+from utils import MONITORING_MATCHER
 
 class HumanLikeScraper:
     def __init__(self):
@@ -225,7 +226,7 @@ class HumanLikeScraper:
                     
                     # Check for keywords
                     combined_text = f"{description} {address}".lower()
-                    found_keywords = [kw for kw in MONITORING_KEYWORDS if kw.lower() in combined_text]
+                    found_keywords = MONITORING_MATCHER.find_lowered(combined_text)
                     
                     if found_keywords:
                         print(f"      🎯 KEYWORD MATCH! {', '.join(found_keywords)}")
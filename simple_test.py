@@ -4,6 +4,7 @@ Simple test script to try different approaches for accessing planning portals
 """
 
 import requests
+from urllib3.util.request import ACCEPT_ENCODING
 import time
 from bs4 import BeautifulSoup
 from config import BOROUGHS_CONFIG
@@ -114,7 +115,7 @@ def test_search_with_simple_terms():
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
+        'Accept-Encoding': ACCEPT_ENCODING,
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1'
     })
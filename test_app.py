@@ -109,6 +109,42 @@ def test_database():
         apps_df = db.get_applications()
         assert len(apps_df) == 1, "Should have 1 application after insert"
         
+        # Test keyword statistics
+        stats = db.get_statistics()
+        assert stats['by_keyword']['noise monitoring'] == 1, f"Keyword count wrong: {stats['by_keyword']}"
+        assert stats['by_keyword']['dust monitoring'] == 0, f"Keyword count wrong: {stats['by_keyword']}"
+        assert len(db.get_applications(keyword="Noise Monitoring")) == 1, "Keyword filter should match case-insensitively"
+        assert len(db.get_applications(keyword="noise")) == 1, "Keyword filter should match substrings"
+        assert len(db.get_applications(keyword="dust")) == 0, "Keyword filter matched the wrong keyword"
+        
+        # Test a failed transaction rolls its inserts back
+        try:
+            with db.transaction():
+                db.bulk_insert_applications([dict(sample_app, project_id='TEST002')])
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert len(db.get_applications()) == 1, "Rolled back transaction should not add applications"
+        
+        # Test the context manager closes the connection
+        with PlanningDatabase(":memory:") as scoped_db:
+            assert scoped_db.get_statistics()['total_applications'] == 0
+        
+        # Test re-inserting known applications returns early without the writer
+        # (on a file database, where reads don't go through the writer connection)
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with PlanningDatabase(os.path.join(tmp_dir, "test.db")) as file_db:
+                batch = [dict(sample_app, project_id=f'DUP{i}') for i in range(3)]
+                assert file_db.bulk_insert_applications(batch) == (3, 3), "Initial batch not inserted"
+                
+                def writer_not_expected():
+                    raise AssertionError("Duplicate-only batch took the writer")
+                file_db.get_writer = writer_not_expected
+                assert file_db.bulk_insert_applications(batch) == (3, 0), "Duplicates were not skipped"
+                del file_db.get_writer
+        
         logger.info("✅ Database tests passed")
         return True
         
@@ -121,7 +157,7 @@ def test_utils():
     logger.info("Testing utilities...")
     
     try:
-        from utils import TextProcessor, ValidationUtils, ScrapingUtils
+        from utils import TextProcessor, ValidationUtils, ScrapingUtils, KeywordMatcher, RateLimiter, RateController
         
         # Test text processing
         text = "  This is a test with   extra spaces  "
@@ -134,6 +170,32 @@ def test_utils():
         assert 'noise monitoring' in keywords, "Failed to detect 'noise monitoring'"
         assert 'dust monitoring' in keywords, "Failed to detect 'dust monitoring'"
         
+        # Test single-pass keyword matching (case-insensitive, keyword-list order)
+        matcher = KeywordMatcher(['monitoring', 'Tree Monitoring', 'dust'])
+        found = matcher.find("Works include TREE monitoring and dust screens")
+        assert found == ['monitoring', 'Tree Monitoring', 'dust'], f"Keyword matching failed: {found}"
+        assert matcher.find("no relevant terms") == [], "Keyword matcher reported a false match"
+        matcher.automaton = None  # regex-prefiltered fallback must agree
+        found = matcher.find("Works include TREE monitoring and dust screens")
+        assert found == ['monitoring', 'Tree Monitoring', 'dust'], f"Fallback keyword matching failed: {found}"
+        assert matcher.find("no relevant terms") == [], "Fallback keyword matcher reported a false match"
+        
+        # Test rate limiting (first call is free, the next waits out the interval)
+        limiter = RateLimiter(0.05)
+        assert limiter.wait() == 0, "First rate-limited call should not wait"
+        assert limiter.wait() > 0, "Second rate-limited call did not wait"
+        
+        # Test adaptive rate control (successes speed up, 429s and Retry-After back off)
+        class FakeResponse:
+            def __init__(self, status_code, headers=None):
+                self.status_code = status_code
+                self.headers = headers or {}
+        
+        controller = RateController(2.0)
+        assert controller.record(FakeResponse(200)) == 1.8, "Success should shrink the interval"
+        assert controller.record(FakeResponse(429)) == 3.6, "429 should double the interval"
+        assert controller.record(FakeResponse(503, {'Retry-After': '10'})) == 10, "Retry-After should be honoured"
+        
         # Test date parsing
         date_str = "15/01/2024"
         parsed_date = TextProcessor.parse_date(date_str)
@@ -200,6 +262,16 @@ def test_manager():
         assert 'boroughs' in status, "Missing boroughs in status"
         assert 'total_boroughs' in status, "Missing total_boroughs in status"
         
+        # Status updates publish a new snapshot rather than mutating the old one
+        borough = next(iter(manager.scraping_status))
+        before = manager.scraping_status[borough]
+        manager.update_progress(borough, "noise", 1, 4, "processing")
+        after = manager.scraping_status[borough]
+        assert before is not after and before.keywords_completed == 0, "Status mutated in place"
+        progress = manager.get_scraping_status()['boroughs'][borough]['progress_percentage']
+        assert progress == 25.0, "Progress not recomputed"
+        manager.cleanup()
+
         logger.info("✅ Manager tests passed")
         return True
         
@@ -5,12 +5,22 @@ Contains helper functions for web scraping, text processing, and validation
 
 import time
 import logging
+import threading
 import requests
+from urllib3.util.request import ACCEPT_ENCODING
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urljoin, urlparse
 from typing import List, Dict, Optional, Set
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+# Try to import pyahocorasick - optional accelerator for multi-keyword scans
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 from config import SCRAPING_CONFIG, MONITORING_KEYWORDS
 
@@ -21,17 +31,22 @@ logger = logging.getLogger(__name__)
 class ScrapingUtils:
     """Utility class for web scraping operations"""
     
-    def __init__(self):
+    def __init__(self, session: requests.Session = None):
         self.request_counts = {}
         self.last_request_times = {}
-        self.session = requests.Session()  # Use session for cookie persistence
+        self.rate_controllers = {}  # Adaptive request spacing per domain
+        self.initialized_domains = set()
+        self.session_init_lock = threading.Lock()  # concurrent keyword searches initialise a domain once
+        # Use session for cookie persistence; callers may share one pooled session
+        # across scrapers so keep-alive connections are reused between them
+        self.session = session or requests.Session()
         
         # Enhanced headers to look more like a real browser
         self.session.headers.update({
             'User-Agent': SCRAPING_CONFIG['user_agent'],
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Sec-Fetch-Dest': 'document',
@@ -41,6 +56,15 @@ class ScrapingUtils:
             'Cache-Control': 'max-age=0'
         })
     
+    def rate_controller(self, domain: str) -> 'RateController':
+        """The domain's RateController, starting at the configured request_delay"""
+        controller = self.rate_controllers.get(domain)
+        if controller is None:
+            # setdefault is atomic, so concurrent first requests all get the same controller;
+            # session_init_lock can't be used as it is held while initialisation requests run
+            controller = self.rate_controllers.setdefault(domain, RateController(SCRAPING_CONFIG['request_delay']))
+        return controller
+    
     def can_fetch(self, url: str, user_agent: str = '*') -> bool:
         """Check if we can fetch the URL according to robots.txt"""
         if not SCRAPING_CONFIG['respect_robots_txt']:
@@ -64,13 +88,8 @@ class ScrapingUtils:
         if domain is None:
             domain = urlparse(url).netloc
         
-        # Implement rate limiting
-        if domain in self.last_request_times:
-            time_since_last = time.time() - self.last_request_times[domain]
-            if time_since_last < SCRAPING_CONFIG['request_delay']:
-                sleep_time = SCRAPING_CONFIG['request_delay'] - time_since_last
-                logger.info(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
+        # Requests are spaced by the domain's adaptive interval
+        controller = self.rate_controller(domain)
         
         # Check robots.txt
         if not self.can_fetch(url):
@@ -79,6 +98,9 @@ class ScrapingUtils:
         
         # Make request with retries
         for attempt in range(SCRAPING_CONFIG['max_retries']):
+            slept = controller.wait()
+            if slept > 0:
+                logger.info(f"Rate limiting: slept {slept:.2f} seconds")
             try:
                 response = self.session.get(
                     url, 
@@ -87,13 +109,12 @@ class ScrapingUtils:
                 )
                 
                 self.last_request_times[domain] = time.time()
+                interval = controller.record(response)
                 
                 if response.status_code == 200:
                     return response
                 elif response.status_code == 429:  # Too Many Requests
-                    wait_time = min(30, SCRAPING_CONFIG['request_delay'] * (2 ** attempt))
-                    logger.warning(f"Rate limited by server, waiting {wait_time} seconds")
-                    time.sleep(wait_time)
+                    logger.warning(f"Rate limited by server, backing off to {interval:.1f}s between requests")
                 else:
                     logger.warning(f"HTTP {response.status_code} for {url}")
                     
@@ -109,16 +130,14 @@ class ScrapingUtils:
         if domain is None:
             domain = urlparse(url).netloc
         
-        # Implement rate limiting
-        if domain in self.last_request_times:
-            time_since_last = time.time() - self.last_request_times[domain]
-            if time_since_last < SCRAPING_CONFIG['request_delay']:
-                sleep_time = SCRAPING_CONFIG['request_delay'] - time_since_last
-                logger.info(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
+        # Requests are spaced by the domain's adaptive interval
+        controller = self.rate_controller(domain)
         
         # Make POST request with retries
         for attempt in range(SCRAPING_CONFIG['max_retries']):
+            slept = controller.wait()
+            if slept > 0:
+                logger.info(f"Rate limiting: slept {slept:.2f} seconds")
             try:
                 response = self.session.post(
                     url,
@@ -128,13 +147,12 @@ class ScrapingUtils:
                 )
                 
                 self.last_request_times[domain] = time.time()
+                interval = controller.record(response)
                 
                 if response.status_code == 200:
                     return response
                 elif response.status_code == 429:  # Too Many Requests
-                    wait_time = min(30, SCRAPING_CONFIG['request_delay'] * (2 ** attempt))
-                    logger.warning(f"Rate limited by server, waiting {wait_time} seconds")
-                    time.sleep(wait_time)
+                    logger.warning(f"Rate limited by server, backing off to {interval:.1f}s between requests")
                 else:
                     logger.warning(f"HTTP {response.status_code} for {url}")
                     
@@ -179,9 +197,12 @@ class ScrapingUtils:
         """Make POST request with session initialization if needed"""
         try:
             # First try to initialize session
-            if domain not in self.last_request_times:
-                logger.info(f"First request to {domain}, initializing session...")
-                self.initialize_session_for_domain(domain, url)
+            if domain not in self.initialized_domains:
+                with self.session_init_lock:
+                    if domain not in self.initialized_domains:
+                        logger.info(f"First request to {domain}, initializing session...")
+                        self.initialize_session_for_domain(domain, url)
+                        self.initialized_domains.add(domain)
             
             # Update headers for POST request
             post_headers = {
@@ -195,12 +216,10 @@ class ScrapingUtils:
             }
             
             # Rate limiting
-            if domain in self.last_request_times:
-                time_since_last = time.time() - self.last_request_times[domain]
-                if time_since_last < SCRAPING_CONFIG['request_delay']:
-                    sleep_time = SCRAPING_CONFIG['request_delay'] - time_since_last
-                    logger.info(f"Rate limiting: waiting {sleep_time:.1f}s for {domain}")
-                    time.sleep(sleep_time)
+            controller = self.rate_controller(domain)
+            slept = controller.wait()
+            if slept > 0:
+                logger.info(f"Rate limiting: waited {slept:.1f}s for {domain}")
             
             # Make the POST request
             logger.info(f"Making POST request to {url}")
@@ -213,6 +232,7 @@ class ScrapingUtils:
             )
             
             self.last_request_times[domain] = time.time()
+            controller.record(response)
             
             logger.info(f"POST response: {response.status_code} from {domain}")
             
@@ -259,13 +279,14 @@ class TextProcessor:
             return []
         
         if keywords is None:
-            keywords = MONITORING_KEYWORDS
+            return MONITORING_MATCHER.find(text)
         
+        lowered = [keyword.lower() for keyword in keywords]
         text_lower = text.lower()
         detected = []
         
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
+        for keyword, keyword_lower in zip(keywords, lowered):
+            if keyword_lower in text_lower:
                 detected.append(keyword)
         
         return detected
@@ -351,6 +372,120 @@ class TextProcessor:
         
         return None
 
+class KeywordMatcher:
+    """Case-insensitive multi-keyword matcher, built once per keyword list"""
+    
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(keywords)
+        self.lowered = [keyword.lower() for keyword in self.keywords]
+        self.automaton = None
+        # Without pyahocorasick, one C-level regex pass rules out non-matching text
+        # before the per-keyword checks (overlapping keywords still need those)
+        self.pattern = re.compile('|'.join(re.escape(keyword) for keyword in self.lowered))
+        
+        if AHOCORASICK_AVAILABLE:
+            # One Aho-Corasick automaton scans the text once for every keyword
+            self.automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.lowered):
+                self.automaton.add_word(keyword, index)
+            self.automaton.make_automaton()
+    
+    def find(self, text: str) -> List[str]:
+        """Return the keywords present in text, in keyword-list order"""
+        if not text:
+            return []
+        
+        return self.find_lowered(text.lower())
+    
+    def find_lowered(self, text_lower: str) -> List[str]:
+        """Like find(), for text the caller has already lowercased"""
+        if self.automaton is not None:
+            hits = {index for _, index in self.automaton.iter(text_lower)}
+            return [self.keywords[index] for index in sorted(hits)]
+        
+        if not self.pattern.search(text_lower):
+            return []
+        
+        return [keyword for keyword, lowered in zip(self.keywords, self.lowered) if lowered in text_lower]
+
+# Shared matcher for the configured monitoring keywords
+MONITORING_MATCHER = KeywordMatcher(MONITORING_KEYWORDS)
+
+class RateLimiter:
+    """Spaces calls at least `interval` seconds apart, shared safely between threads.
+    
+    Unlike a fixed sleep after each request, time already spent waiting on the
+    server counts towards the interval, so slow responses aren't followed by
+    an extra full delay.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_allowed = 0.0
+        self.lock = threading.Lock()
+    
+    def wait(self) -> float:
+        """Block until the next slot is free; returns the seconds slept"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_allowed)
+            self.next_allowed = start + self.interval
+        
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+class RateController(RateLimiter):
+    """RateLimiter whose interval adapts to how the server is coping (AIMD).
+    
+    Successful responses shrink the interval by 10%, down to `min_interval`;
+    429/5xx responses, a Retry-After header or a nearly exhausted
+    X-RateLimit-Remaining double it, up to `max_interval`.
+    """
+    
+    def __init__(self, interval: float, min_interval: float = None, max_interval: float = 60.0):
+        super().__init__(interval)
+        self.min_interval = interval / 2 if min_interval is None else min_interval
+        self.max_interval = max_interval
+    
+    @staticmethod
+    def retry_after_seconds(response) -> float:
+        """Seconds requested by a Retry-After header (delta or HTTP date), else 0"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return 0.0
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return 0.0
+    
+    @staticmethod
+    def quota_nearly_spent(response) -> bool:
+        """Whether X-RateLimit-Remaining is below 10% of X-RateLimit-Limit"""
+        try:
+            remaining = int(response.headers['X-RateLimit-Remaining'])
+            limit = int(response.headers['X-RateLimit-Limit'])
+        except (KeyError, ValueError):
+            return False
+        return limit > 0 and remaining < limit * 0.1
+    
+    def record(self, response) -> float:
+        """Adjust the interval from a response; returns the new interval"""
+        retry_after = self.retry_after_seconds(response)
+        with self.lock:
+            if response.status_code == 429 or response.status_code >= 500 or retry_after:
+                # Back off, and make the next request wait out the new interval from now
+                self.interval = max(min(self.max_interval, self.interval * 2), retry_after)
+                self.next_allowed = max(self.next_allowed, time.monotonic() + self.interval)
+            elif self.quota_nearly_spent(response):
+                self.interval = min(self.max_interval, self.interval * 2)
+            elif response.status_code < 400:
+                self.interval = max(self.min_interval, self.interval * 0.9)
+            return self.interval
+
 class ValidationUtils:
     """Utility class for data validation"""
     
@@ -7,7 +7,8 @@ that don't require search form submissions
 import requests
 import time
 from bs4 import BeautifulSoup
-from config import BOROUGHS_CONFIG, MONITORING_KEYWORDS
+from config import BOROUGHS_CONFIG
+from utils import MONITORING_MATCHER
 import re
 from datetime import datetime
 
@@ -129,7 +130,7 @@ class WeeklyListsScraper:
             
             # Check for monitoring keywords
             combined_text = f"{description} {address}".lower()
-            found_keywords = [kw for kw in MONITORING_KEYWORDS if kw.lower() in combined_text]
+            found_keywords = MONITORING_MATCHER.find_lowered(combined_text)
             
             if found_keywords:
                 print(f"      🎯 KEYWORD MATCH! {', '.join(found_keywords)}")
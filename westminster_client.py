@@ -0,0 +1,400 @@
+"""
+Shared client for the Westminster Idox search scripts
+Handles the pooled session, the session-scoped CSRF token, simple-search
+submission and parsing of the results list
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Tuple
+from pathlib import Path
+import lxml.html
+from lxml import etree
+from urllib3.util.request import ACCEPT_ENCODING
+from http_client import build_session, mount_pooled_adapter
+from utils import KeywordMatcher, RateLimiter
+
+# Try to import orjson - optional faster serialiser for the JSONL output
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+BASE_URL = "https://idoxpa.westminster.gov.uk"
+SEARCH_URL = f"{BASE_URL}/online-applications/search.do"
+SUBMIT_URL = f"{BASE_URL}/online-applications/simpleSearchResults.do?action=firstPage"
+CSRF_CACHE_PATH = Path.home() / '.cache' / 'wminster_csrf.json'
+
+# Result pages are kept on disk for an hour so repeat runs skip the network
+RESPONSE_CACHE_PATH = Path.home() / '.cache' / 'westminster_responses.db'
+RESPONSE_CACHE_TTL = 3600
+
+# Held while the search page is fetched so parallel searches never fetch it twice
+CSRF_LOCK = threading.Lock()
+
+# Politeness: searches start at most this often, however many run in parallel
+SEARCH_INTERVAL = 2.0
+
+# Result-page banners, matched case-insensitively on the raw bytes so the page
+# is never decoded or lowercased just to look for them
+TOO_MANY_RESULTS_RE = re.compile(rb'(?i)too many results found')
+NO_RESULTS_RE = re.compile(rb'(?i)no (?:results|applications found)')
+
+# Every result item carries this class; a page without it has nothing worth parsing
+RESULT_ITEM_MARKER = b'searchresult'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    # Advertises br/zstd only when their decoders (brotli, zstandard) are installed
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Referer': SEARCH_URL
+}
+
+# The results list and its items are found with compiled XPath; item_parts() does the rest
+CSRF_XPATH = etree.XPath("//input[@name='_csrf']/@value")
+CSRF_RE = re.compile(rb'name="_csrf"\s+value="([^"]+)"')
+RESULTS_LIST_XPATH = etree.XPath("//ul[@id='searchresults']")
+RESULT_ITEM_XPATH = etree.XPath("li[contains(concat(' ', normalize-space(@class), ' '), ' searchresult ')]")
+
+# Fields of the "Ref. No: ... | Received: ... | Validated: ... | Status: ..." line under
+# each result, read in one left-to-right scan; any field may be missing
+META_RE = re.compile(
+    r'(?:.*?Ref\. No:\s*(?P<ref>[^|]+))?'
+    r'(?:.*?Received:\s*(?P<recv>[^|]+))?'
+    r'(?:.*?Status:\s*(?P<status>\S+))?',
+    re.DOTALL
+)
+
+# Keywords flagged in each result's description and address, matched in one pass
+MONITORING_MATCHER = KeywordMatcher([
+    'monitoring', 'noise', 'vibration', 'dust', 'subsidence',
+    'environmental', 'acoustic', 'sound', 'tree monitoring',
+    'construction management', 'arboricultural', 'supervision'
+])
+
+@dataclass
+class Application:
+    """One search result; slotted since a crawl can hold thousands of them"""
+    __slots__ = (
+        'reference', 'address', 'description', 'status', 'received_date',
+        'url', 'search_term', 'borough', 'keywords', 'scraped_at'
+    )
+    
+    reference: str
+    address: str
+    description: str
+    status: str
+    received_date: str
+    url: str
+    search_term: str
+    borough: str
+    keywords: Tuple[str, ...]
+    scraped_at: str
+
+def application_jsonl(application):
+    """Serialise an Application as one UTF-8 JSON line"""
+    record = asdict(application)
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record) + b'\n'
+    return json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+
+def element_text(element):
+    """Stripped text of an element, joined the way BeautifulSoup's get_text(strip=True) does"""
+    if element is None:
+        return ""
+    return ''.join(text.strip() for text in element.itertext())
+
+def item_parts(item):
+    """Find a result item's summary link, address and meta-info nodes in one walk"""
+    link = address_p = meta_p = None
+    
+    for element in item.iter('a', 'p'):
+        classes = (element.get('class') or '').split()
+        if element.tag == 'a':
+            if link is None and 'summaryLink' in classes:
+                link = element
+        elif address_p is None and 'address' in classes:
+            address_p = element
+        elif meta_p is None and 'metaInfo' in classes:
+            meta_p = element
+    
+    return link, address_p, meta_p
+
+def parse_meta(meta_text):
+    """Split a result's metaInfo text into (reference, received date, status)"""
+    match = META_RE.match(meta_text)
+    return tuple((match[field] or "").strip() for field in ('ref', 'recv', 'status'))
+
+def first(matches):
+    """First node of an XPath result, or None"""
+    return matches[0] if matches else None
+
+def load_csrf_cache():
+    """Read the cached landing-page validators, CSRF token and cookies"""
+    try:
+        with open(CSRF_CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_csrf_cache(session, response, token):
+    """Remember the landing page's validators alongside the token and cookies it belongs to"""
+    cache = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'csrf': token,
+        'cookies': session.cookies.get_dict()
+    }
+    # The token only works with its session cookie, so the cookies are kept too;
+    # they are live credentials, so the file is readable by its owner only
+    try:
+        CSRF_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(CSRF_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as f:
+            os.chmod(CSRF_CACHE_PATH, 0o600)  # files written before this kept their old mode
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+def fetch_csrf(session, refresh=False, rejected=None):
+    """Return the session's CSRF token, fetching the search page only when needed"""
+    token = getattr(session, '_csrf', None)
+    if token and not refresh:
+        return token
+    
+    # Concurrent searches share one fetch: the first thread in downloads the page
+    # and the rest pick up the token it stored, unless it's the one they saw rejected
+    with CSRF_LOCK:
+        token = getattr(session, '_csrf', None)
+        if token and (not refresh or (rejected is not None and token != rejected)):
+            return token
+        
+        return download_csrf(session, refresh)
+
+def download_csrf(session, refresh=False):
+    """Fetch the search page and store its CSRF token on the session"""
+    # The token is bound to the session cookie, so a cached one is only reusable
+    # with its cookies restored; a refresh always asks for a fresh page
+    headers = {}
+    cache = {} if refresh else load_csrf_cache()
+    if cache.get('csrf'):
+        session.cookies.update(cache.get('cookies') or {})
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache['last_modified']
+    
+    # Only one hidden input is needed from the page: a byte scan usually finds it
+    # without parsing, lxml covers other attribute layouts, and the connection goes
+    # back to the pool as soon as the body is in
+    with session.get(SEARCH_URL, headers=headers, timeout=15, stream=True) as response:
+        if response.status_code == 304:
+            session._csrf = cache['csrf']
+            return session._csrf
+        if response.status_code != 200 or not response.content:
+            return None
+        
+        match = CSRF_RE.search(response.content)
+        if match:
+            tokens = [match.group(1).decode('utf-8')]
+        else:
+            tokens = CSRF_XPATH(lxml.html.fromstring(response.content))
+    
+    if not tokens:
+        return None
+    
+    # Idox tokens live as long as the session, so keep it there for every search
+    session._csrf = str(tokens[0])
+    save_csrf_cache(session, response, session._csrf)
+    return session._csrf
+
+def is_csrf_rejected(response):
+    """Check whether the portal refused a POST because of its CSRF token"""
+    return response.status_code == 403 or b'invalid csrf' in response.content.lower()
+
+def submit_search(session, search_term, timeout=15):
+    """POST a simple search, refreshing the CSRF token once if it was rejected"""
+    response = None
+    
+    csrf_token = None
+    for refresh in (False, True):
+        csrf_token = fetch_csrf(session, refresh=refresh, rejected=csrf_token)
+        if not csrf_token:
+            return response
+        
+        form_data = {
+            '_csrf': csrf_token,
+            'searchType': 'Application',
+            'searchCriteria.caseStatus': '',
+            'searchCriteria.simpleSearchString': search_term,
+            'searchCriteria.simpleSearch': 'true'
+        }
+        
+        response = session.post(SUBMIT_URL, data=form_data, timeout=timeout)
+        if not is_csrf_rejected(response):
+            break
+    
+    return response
+
+class CachedResponse:
+    """The parts of a results response the scripts read, replayed from the cache"""
+    from_cache = True
+    
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+class ResponseCache:
+    """SQLite store of search result pages keyed by search term and session epoch
+    (the CSRF token they were fetched under), so a new portal session starts empty"""
+    
+    def __init__(self, path=RESPONSE_CACHE_PATH, expire_after=RESPONSE_CACHE_TTL):
+        self.expire_after = expire_after
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self.conn.execute('DROP TABLE IF EXISTS responses')  # term-only keys, superseded
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS session_responses (
+                search_term TEXT NOT NULL,
+                session_epoch TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                content BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (search_term, session_epoch)
+            )
+        ''')
+    
+    def get(self, search_term, session_epoch):
+        """Return a fresh cached response for the term in this session, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT status_code, content FROM session_responses '
+                'WHERE search_term = ? AND session_epoch = ? AND fetched_at >= ?',
+                (search_term, session_epoch, time.time() - self.expire_after)
+            ).fetchone()
+        return CachedResponse(row[0], row[1]) if row else None
+    
+    def put(self, search_term, session_epoch, response):
+        """Store a successful results page; anything else is worth retrying next run"""
+        if response.status_code != 200 or not session_epoch:
+            return
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO session_responses '
+                '(search_term, session_epoch, status_code, content, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (search_term, session_epoch, response.status_code, response.content, time.time())
+            )
+    
+    def clear(self):
+        """Forget every cached page"""
+        with self.lock:
+            self.conn.execute('DELETE FROM session_responses')
+
+class WestminsterClient:
+    """One pooled session for every search a script makes against the portal"""
+    
+    def __init__(self, session=None, search_interval=SEARCH_INTERVAL, cache=None):
+        if session is None:
+            session = build_session()
+        else:
+            mount_pooled_adapter(session)
+        self.session = session
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.rate_limiter = RateLimiter(search_interval)
+        self.cache = cache
+    
+    def get_csrf(self, refresh=False):
+        """Return the session's CSRF token, fetching it only when needed"""
+        return fetch_csrf(self.session, refresh=refresh)
+    
+    def search_page(self, search_term):
+        """Submit a simple search and return the raw response (None without a token)"""
+        if self.cache is not None:
+            # Pages are only replayed within the portal session they came from
+            session_epoch = self.get_csrf()
+            cached = self.cache.get(search_term, session_epoch) if session_epoch else None
+            if cached is not None:
+                return cached
+        
+        self.rate_limiter.wait()
+        response = submit_search(self.session, search_term)
+        
+        if self.cache is not None and response is not None:
+            # A rejected token is refreshed during the search, so read the current one
+            self.cache.put(search_term, getattr(self.session, '_csrf', None), response)
+        return response
+    
+    def search(self, search_term):
+        """Submit a simple search and return the applications on the results page"""
+        response = self.search_page(search_term)
+        if response is None or response.status_code != 200:
+            return []
+        
+        return self.parse_results(response.content, search_term)
+    
+    def parse_results(self, html, search_term, matcher=MONITORING_MATCHER):
+        """Parse the <ul id="searchresults"> list of a results page into Applications"""
+        if RESULT_ITEM_MARKER not in html:
+            return []
+        
+        return self.parse_results_tree(lxml.html.fromstring(html), search_term, matcher) or []
+    
+    def parse_results_tree(self, tree, search_term, matcher=MONITORING_MATCHER):
+        """Like parse_results() for an already-parsed page; None if it has no results list"""
+        results_ul = first(RESULTS_LIST_XPATH(tree))
+        if results_ul is None:
+            return None
+        
+        applications = []
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        for item in RESULT_ITEM_XPATH(results_ul):
+            # Get the main link with description, the address and the metadata
+            link, address_p, meta_p = item_parts(item)
+            if link is None:
+                continue
+            
+            app_url = link.get('href', '')
+            if app_url and not app_url.startswith('http'):
+                app_url = f"{BASE_URL}{app_url}"
+            
+            description = element_text(link.find('.//div'))
+            address = element_text(address_p)
+            
+            # Get metadata (reference, dates, status)
+            reference = ""
+            received_date = ""
+            status = ""
+            
+            if meta_p is not None:
+                reference, received_date, status = parse_meta(meta_p.text_content())
+            
+            # Check for monitoring keywords in description and address
+            combined_text = f"{description} {address}".lower()
+            
+            applications.append(Application(
+                reference=reference,
+                address=address,
+                description=description,
+                status=status,
+                received_date=received_date,
+                url=app_url,
+                search_term=search_term,
+                borough='Westminster',
+                keywords=tuple(matcher.find_lowered(combined_text)),
+                scraped_at=scraped_at
+            ))
+        
+        return applications